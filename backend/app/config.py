@@ -1,10 +1,21 @@
 """Application configuration."""
 
 from functools import lru_cache
+from typing import Optional
 from urllib.parse import urlparse, unquote
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Small ClickHouse inserts (daily incrementals) are left to the server to
+# coalesce: async_insert buffers them into one part; wait_for_async_insert=1
+# keeps the call blocking until the buffer is flushed, so a returned insert
+# is durable.
+CLICKHOUSE_ASYNC_INSERT_SETTINGS = {
+    "async_insert": 1,
+    "wait_for_async_insert": 1,
+    "async_insert_busy_timeout_ms": 1000,
+}
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -83,6 +94,14 @@ class Settings(BaseSettings):
     clickhouse_user: str = "default"
     clickhouse_password: str = ""
     clickhouse_db: str = "mms_analytics"
+    clickhouse_insert_batch_size: int = 65536  # rows per insert (one native block)
+    clickhouse_async_insert_threshold: int = 5000  # smaller inserts use async_insert
+
+    def get_clickhouse_insert_settings(self, n_rows: int) -> Optional[dict]:
+        """Insert settings for an n_rows insert (async_insert below the threshold)."""
+        if n_rows < self.clickhouse_async_insert_threshold:
+            return CLICKHOUSE_ASYNC_INSERT_SETTINGS
+        return None
 
     # Redis
     redis_host: str = "redis"
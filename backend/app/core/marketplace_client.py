@@ -17,6 +17,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 from curl_cffi import requests as curl_requests
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
@@ -49,10 +50,21 @@ MARKETPLACE_URLS = {
     "wildberries_marketplace": "https://marketplace-api.wildberries.ru",
     "wildberries_analytics": "https://seller-analytics-api.wildberries.ru",
     "ozon": "https://api-seller.ozon.ru",
+    "ozon_finance": "https://api-seller.ozon.ru",
+    "ozon_analytics": "https://api-seller.ozon.ru",
     "ozon_performance": "https://api-performance.ozon.ru",
 }
 
 
+def _retry_after_seconds(headers) -> Optional[float]:
+    """Retry-After (delta-seconds form) from a 429 response, if present."""
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
 class ShopDisabledError(Exception):
     """
     Raised when shop is disabled due to auth errors.
@@ -142,6 +154,7 @@ class MarketplaceClient:
         self._rate_limiter: Optional[RedisRateLimiter] = None
         self._circuit_breaker: Optional[CircuitBreaker] = None
         self._current_proxy: Optional[ProxyConfig] = None
+        self._http: Optional[curl_requests.AsyncSession] = None
     
     async def __aenter__(self):
         """Initialize components and get sticky proxy."""
@@ -164,10 +177,17 @@ class MarketplaceClient:
                 sticky=True,
             )
         
+        # One curl session per client: connections (HTTP/2 under the chrome
+        # impersonation) are kept alive and reused across requests
+        self._http = curl_requests.AsyncSession()
+        
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Cleanup: clear sticky session."""
+        """Cleanup: close HTTP session, clear sticky session."""
+        if self._http:
+            await self._http.close()
+            self._http = None
         if self._proxy_provider:
             self._proxy_provider.clear_sticky_session(self.shop_id)
     
@@ -247,8 +267,9 @@ class MarketplaceClient:
             # Build headers
             headers = self._get_headers(kwargs.pop("headers", None))
             
-            # Make request with curl_cffi (JA3 fingerprint spoofing)
-            response = curl_requests.request(
+            # Make request with curl_cffi (JA3 fingerprint spoofing) on the
+            # client's async session, reusing its open connections.
+            response = await self._http.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -262,7 +283,7 @@ class MarketplaceClient:
             
             # Parse response
             try:
-                data = response.json()
+                data = orjson.loads(response.content)
             except Exception:
                 data = response.text
             
@@ -276,7 +297,10 @@ class MarketplaceClient:
             
             # Handle rate limiting and proxy feedback
             if result.is_rate_limited:
-                await report_429_error(self.shop_id, self.marketplace)
+                await report_429_error(
+                    self.shop_id, self.marketplace,
+                    retry_after=_retry_after_seconds(response.headers),
+                )
                 if self._current_proxy and self._proxy_provider:
                     await self._proxy_provider.report_failure(
                         self._current_proxy,
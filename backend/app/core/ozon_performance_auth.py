@@ -17,7 +17,7 @@ import asyncio
 import json
 import logging
 import time
-from typing import Optional
+from typing import Optional, Tuple
 
 import httpx
 
@@ -57,6 +57,8 @@ class OzonPerformanceAuth:
         # In-memory cache
         self._token: Optional[str] = None
         self._expires_at: float = 0
+        # Single-flight refresh: concurrent callers wait for one fetch
+        self._lock = asyncio.Lock()
 
     def _is_expired(self) -> bool:
         """Check if token is expired or about to expire."""
@@ -94,8 +96,8 @@ class OzonPerformanceAuth:
         )
         return data
 
-    async def _try_redis_cache(self) -> Optional[str]:
-        """Try to get token from Redis cache."""
+    async def _try_redis_cache(self) -> Optional[Tuple[str, float]]:
+        """Try to get (token, expires_at) from Redis cache."""
         if not self._redis:
             return None
         try:
@@ -104,7 +106,7 @@ class OzonPerformanceAuth:
                 data = json.loads(cached)
                 if time.time() < data.get("expires_at", 0) - TOKEN_REFRESH_MARGIN:
                     logger.debug("Ozon Performance token from Redis cache")
-                    return data["access_token"]
+                    return data["access_token"], data["expires_at"]
         except Exception as e:
             logger.warning("Redis cache read error: %s", e)
         return None
@@ -134,22 +136,27 @@ class OzonPerformanceAuth:
         if self._token and not self._is_expired():
             return self._token
 
-        # 2. Check Redis cache
-        cached = await self._try_redis_cache()
-        if cached:
-            self._token = cached
-            return cached
+        async with self._lock:
+            # Another caller may have refreshed it while we waited
+            if self._token and not self._is_expired():
+                return self._token
 
-        # 3. Fetch new token
-        data = await self._fetch_token()
-        self._token = data["access_token"]
-        expires_in = data.get("expires_in", DEFAULT_TTL)
-        self._expires_at = time.time() + expires_in
+            # 2. Check Redis cache (keep its expiry, so later calls hit step 1)
+            cached = await self._try_redis_cache()
+            if cached:
+                self._token, self._expires_at = cached
+                return self._token
+
+            # 3. Fetch new token
+            data = await self._fetch_token()
+            self._token = data["access_token"]
+            expires_in = data.get("expires_in", DEFAULT_TTL)
+            self._expires_at = time.time() + expires_in
 
-        # 4. Save to Redis
-        await self._save_redis_cache(self._token, self._expires_at)
+            # 4. Save to Redis
+            await self._save_redis_cache(self._token, self._expires_at)
 
-        return self._token
+            return self._token
 
     def get_headers(self, token: str) -> dict:
         """Build request headers with Bearer auth."""
@@ -66,6 +66,30 @@ MARKETPLACE_LIMITS: Dict[str, RateLimitConfig] = {
         window_seconds=1.0,
         max_requests_in_window=10,
     ),
+    "ozon_finance": RateLimitConfig(
+        # /v3/finance/transaction/list: ~1 req / 1.5 sec sustained.
+        # Window of 2 per 3 sec lets concurrent month chunks burst once
+        # instead of each sleeping a fixed pause between pages.
+        requests_per_second=0.67,
+        requests_per_minute=40,
+        requests_per_hour=2400,
+        window_seconds=3.0,
+        max_requests_in_window=2,
+        initial_backoff_seconds=2.0,
+        max_backoff_seconds=60.0,
+        backoff_multiplier=2.0,
+    ),
+    "ozon_analytics": RateLimitConfig(
+        # /v1/analytics/data: aggressive limit, ~1 req / sec sustained
+        requests_per_second=1.0,
+        requests_per_minute=60,
+        requests_per_hour=3600,
+        window_seconds=2.0,
+        max_requests_in_window=2,
+        initial_backoff_seconds=2.0,
+        max_backoff_seconds=60.0,
+        backoff_multiplier=2.0,
+    ),
     "ozon_performance": RateLimitConfig(
         # Ozon Performance API: only order_report() goes through rate limiter.
         # poll/download use raw httpx, so each batch = 1 rate-limited request.
@@ -223,13 +247,21 @@ class RedisRateLimiter:
             # Need to wait
             await asyncio.sleep(poll_interval)
     
-    async def report_rate_limit(self, shop_id: int, marketplace: str = "wildberries"):
+    async def report_rate_limit(
+        self,
+        shop_id: int,
+        marketplace: str = "wildberries",
+        retry_after: Optional[float] = None,
+    ):
         """
         Report 429 error and set exponential backoff with jitter.
         
         JITTER: Adds ±10-30 seconds randomness to prevent Thundering Herd.
         When 50 shops all get 429 at the same time, they won't all wake up
         at exactly the same moment.
+        
+        If the response carried Retry-After, that delay is used instead
+        (plus up to 1s of jitter): the server knows when the window reopens.
         """
         import random
         
@@ -256,6 +288,8 @@ class RedisRateLimiter:
         
         # Final backoff (minimum 1 second)
         backoff = max(1.0, base_backoff + jitter)
+        if retry_after is not None:
+            backoff = max(1.0, retry_after) + random.uniform(0, 1.0)
         
         # Set backoff until
         backoff_until = time.time() + backoff
@@ -353,10 +387,12 @@ async def wait_for_rate_limit(shop_id: int, marketplace: str = "wildberries") ->
     return await limiter.acquire(shop_id, marketplace)
 
 
-async def report_429_error(shop_id: int, marketplace: str = "wildberries"):
-    """Report a 429 error for backoff."""
+async def report_429_error(
+    shop_id: int, marketplace: str = "wildberries", retry_after: Optional[float] = None,
+):
+    """Report a 429 error for backoff (retry_after: server's Retry-After, seconds)."""
     limiter = get_rate_limiter()
-    await limiter.report_rate_limit(shop_id, marketplace)
+    await limiter.report_rate_limit(shop_id, marketplace, retry_after)
 
 
 async def report_request_success(shop_id: int, marketplace: str = "wildberries"):
@@ -10,18 +10,40 @@ Uses Redis Hashes (HSET/HGETALL) for efficient state retrieval.
 """
 import json
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, NamedTuple, Tuple
+import orjson
 import redis
 
 logger = logging.getLogger(__name__)
 
 
+class AdvertsSnapshot(NamedTuple):
+    """Pre-fetched Redis state of many campaigns (see get_adverts_snapshot)."""
+    states: Dict[int, Dict[str, Any]]  # advert_id -> get_state() dict
+    # (advert_id, nm_id) -> (bid_search, bid_recommendations), None if unknown
+    bids: Dict[Tuple[int, int], Tuple[Optional[int], Optional[int]]]
+    # (advert_id, nm_id) -> last views (ITEM_INACTIVE), None if unknown
+    views: Dict[Tuple[int, int], Optional[int]]
+
+
+class AdvertStateUpdate(NamedTuple):
+    """Pending campaign state write (see set_adverts_bulk)."""
+    advert_id: int
+    bids: Dict[int, Tuple[int, int]]  # nm_id -> (bid_search, bid_recommendations), kopecks
+    cpm: Optional[int] = None
+    status: Optional[int] = None
+    items: Optional[List[int]] = None
+    campaign_type: Optional[int] = None
+
+
 class RedisStateManager:
     """
     Manages Last State for advertising campaigns in Redis using Hashes.
     
     Key format (using HSET):
-    - ads:state:{shop_id}:{advert_id} -> {cpm: "500", status: "9", items: "[...]", type: "8"}
+    - ads:state:{shop_id}:{advert_id} -> {cpm: "50000", status: "9", items: "[...]", type: "8"}
+    
+    CPM is stored as integer kopecks so comparisons are exact (no float drift).
     
     Benefits:
     - Single HGETALL to fetch entire campaign state
@@ -44,22 +66,59 @@ class RedisStateManager:
     
     def _key(self, shop_id: int, advert_id: int) -> str:
         return f"{self.PREFIX}:{shop_id}:{advert_id}"
+
+    def _bid_key(self, shop_id: int, advert_id: int, nm_id: int, field: str) -> str:
+        return f"{self.PREFIX}:bid:{shop_id}:{advert_id}:{nm_id}:{field}"
+
+    def _views_key(self, shop_id: int, advert_id: int, nm_id: int) -> str:
+        return f"{self.PREFIX}:views:{shop_id}:{advert_id}:{nm_id}"
+
+    @staticmethod
+    def _parse_cpm(val: Optional[str]) -> Optional[int]:
+        """Parse stored CPM (kopecks); tolerates legacy float strings like "125.0"."""
+        if not val:
+            return None
+        try:
+            return int(val)
+        except ValueError:
+            return int(round(float(val)))
+
+    @staticmethod
+    def _state_mapping(
+        cpm: Optional[int] = None,
+        status: Optional[int] = None,
+        items: Optional[List[int]] = None,
+        campaign_type: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Build HSET mapping from non-None state fields."""
+        mapping = {}
+        if cpm is not None:
+            mapping["cpm"] = str(cpm)
+        if status is not None:
+            mapping["status"] = str(status)
+        if items is not None:
+            mapping["items"] = json.dumps(items)
+        if campaign_type is not None:
+            mapping["campaign_type"] = str(campaign_type)
+        return mapping
     
     # ============ Bulk Operations (Primary API) ============
     
     def get_state(self, shop_id: int, advert_id: int) -> Dict[str, Any]:
         """
         Get full last state for a campaign using HGETALL.
-        Returns dict with cpm, status, items, campaign_type.
+        Returns dict with cpm (kopecks), status, items, campaign_type.
         """
         key = self._key(shop_id, advert_id)
-        raw = self.client.hgetall(key)
-        
+        return self._parse_state(self.client.hgetall(key))
+    
+    def _parse_state(self, raw: Dict[str, str]) -> Dict[str, Any]:
+        """Parse raw HGETALL result of a campaign state hash."""
         if not raw:
             return {"cpm": None, "status": None, "items": [], "campaign_type": None}
         
         # Parse stored values
-        cpm = float(raw["cpm"]) if raw.get("cpm") else None
+        cpm = self._parse_cpm(raw.get("cpm"))
         status = int(raw["status"]) if raw.get("status") else None
         campaign_type = int(raw["campaign_type"]) if raw.get("campaign_type") else None
         
@@ -81,7 +140,7 @@ class RedisStateManager:
         self, 
         shop_id: int, 
         advert_id: int,
-        cpm: Optional[float] = None,
+        cpm: Optional[int] = None,
         status: Optional[int] = None,
         items: Optional[List[int]] = None,
         campaign_type: Optional[int] = None
@@ -91,16 +150,7 @@ class RedisStateManager:
         Only updates fields that are not None.
         """
         key = self._key(shop_id, advert_id)
-        
-        mapping = {}
-        if cpm is not None:
-            mapping["cpm"] = str(cpm)
-        if status is not None:
-            mapping["status"] = str(status)
-        if items is not None:
-            mapping["items"] = json.dumps(items)
-        if campaign_type is not None:
-            mapping["campaign_type"] = str(campaign_type)
+        mapping = self._state_mapping(cpm, status, items, campaign_type)
         
         if mapping:
             self.client.hset(key, mapping=mapping)
@@ -108,10 +158,10 @@ class RedisStateManager:
     
     # ============ Individual Field Access (Convenience) ============
     
-    def get_cpm(self, shop_id: int, advert_id: int) -> Optional[float]:
-        """Get last known CPM for campaign."""
+    def get_cpm(self, shop_id: int, advert_id: int) -> Optional[int]:
+        """Get last known CPM for campaign (kopecks)."""
         val = self.client.hget(self._key(shop_id, advert_id), "cpm")
-        return float(val) if val else None
+        return self._parse_cpm(val)
     
     def get_status(self, shop_id: int, advert_id: int) -> Optional[int]:
         """Get last known status for campaign."""
@@ -137,28 +187,130 @@ class RedisStateManager:
     
     def get_last_views(self, shop_id: int, advert_id: int, nm_id: int) -> Optional[int]:
         """Get last known views count for specific item."""
-        key = f"{self.PREFIX}:views:{shop_id}:{advert_id}:{nm_id}"
+        key = self._views_key(shop_id, advert_id, nm_id)
         val = self.client.get(key)
         return int(val) if val else None
     
     def set_last_views(self, shop_id: int, advert_id: int, nm_id: int, views: int) -> None:
         """Store last views count for specific item."""
-        key = f"{self.PREFIX}:views:{shop_id}:{advert_id}:{nm_id}"
+        key = self._views_key(shop_id, advert_id, nm_id)
         self.client.setex(key, self.TTL_SECONDS, str(views))
 
+    def set_last_views_bulk(self, shop_id: int, advert_id: int, views: Dict[int, int]) -> None:
+        """Store last views counts (nm_id -> views) of a campaign in one pipeline."""
+        if not views:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for nm_id, count in views.items():
+            pipe.setex(self._views_key(shop_id, advert_id, nm_id), self.TTL_SECONDS, str(count))
+        pipe.execute()
+
     # ============ Per-NM Bid Tracking (V2 API) ============
 
     def get_bid(self, shop_id: int, advert_id: int, nm_id: int, field: str) -> Optional[int]:
         """Get last known bid in kopecks for specific nm_id and field (search/recommendations)."""
-        key = f"{self.PREFIX}:bid:{shop_id}:{advert_id}:{nm_id}:{field}"
+        key = self._bid_key(shop_id, advert_id, nm_id, field)
         val = self.client.get(key)
         return int(val) if val else None
 
     def set_bid(self, shop_id: int, advert_id: int, nm_id: int, field: str, value: int) -> None:
         """Store bid in kopecks for specific nm_id and field (search/recommendations)."""
-        key = f"{self.PREFIX}:bid:{shop_id}:{advert_id}:{nm_id}:{field}"
+        key = self._bid_key(shop_id, advert_id, nm_id, field)
         self.client.setex(key, self.TTL_SECONDS, str(value))
 
+    def get_adverts_snapshot(
+        self,
+        shop_id: int,
+        advert_items: Dict[int, List[int]],
+        views_items: Optional[Dict[int, Iterable[int]]] = None,
+    ) -> AdvertsSnapshot:
+        """
+        Fetch states, per-nm_id bids and last views of many campaigns in one pipeline.
+        
+        Args:
+            advert_items: {advert_id: [nm_id, ...]} whose state and bids should be read
+            views_items: {advert_id: nm_ids} whose last views should be read
+                         (ITEM_INACTIVE detection), optional
+        
+        Replaces HGETALL per advert + 2 GET per nm_id + GET per viewed nm_id
+        with a single round-trip.
+        """
+        advert_ids = list(advert_items)
+        bid_keys = [
+            (advert_id, nm_id)
+            for advert_id, nm_ids in advert_items.items()
+            for nm_id in nm_ids
+        ]
+        views_keys = [
+            (advert_id, nm_id)
+            for advert_id, nm_ids in (views_items or {}).items()
+            for nm_id in nm_ids
+        ]
+        
+        pipe = self.client.pipeline(transaction=False)
+        for advert_id in advert_ids:
+            pipe.hgetall(self._key(shop_id, advert_id))
+        if bid_keys:
+            redis_keys = []
+            for advert_id, nm_id in bid_keys:
+                redis_keys.append(self._bid_key(shop_id, advert_id, nm_id, "search"))
+                redis_keys.append(self._bid_key(shop_id, advert_id, nm_id, "recommendations"))
+            pipe.mget(redis_keys)
+        if views_keys:
+            pipe.mget([self._views_key(shop_id, a, nm) for a, nm in views_keys])
+        results = pipe.execute()
+        
+        states = {
+            advert_id: self._parse_state(raw)
+            for advert_id, raw in zip(advert_ids, results)
+        }
+        
+        pos = len(advert_ids)
+        bids = {}
+        if bid_keys:
+            values = results[pos]
+            pos += 1
+            for key, search, reco in zip(bid_keys, values[0::2], values[1::2]):
+                bids[key] = (
+                    int(search) if search else None,
+                    int(reco) if reco else None,
+                )
+        
+        views = {}
+        if views_keys:
+            for key, val in zip(views_keys, results[pos]):
+                views[key] = int(val) if val else None
+        
+        return AdvertsSnapshot(states=states, bids=bids, views=views)
+
+    def set_adverts_bulk(self, shop_id: int, updates: List[AdvertStateUpdate]) -> None:
+        """
+        Write states and per-nm_id bids of many campaigns in one pipeline.
+        
+        Replaces 2 SETEX per nm_id + HSET/EXPIRE per advert with a single round-trip.
+        """
+        if not updates:
+            return
+        
+        pipe = self.client.pipeline(transaction=False)
+        for update in updates:
+            advert_id = update.advert_id
+            for nm_id, (bid_search, bid_reco) in update.bids.items():
+                search_key = self._bid_key(shop_id, advert_id, nm_id, "search")
+                reco_key = self._bid_key(shop_id, advert_id, nm_id, "recommendations")
+                pipe.setex(search_key, self.TTL_SECONDS, str(bid_search))
+                pipe.setex(reco_key, self.TTL_SECONDS, str(bid_reco))
+            
+            mapping = self._state_mapping(
+                update.cpm, update.status, update.items, update.campaign_type
+            )
+            if mapping:
+                key = self._key(shop_id, advert_id)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.TTL_SECONDS)
+        
+        pipe.execute()
+
     COMMERCIAL_TTL = 2 * 24 * 60 * 60  # 2 days (enough for 30-min intervals)
 
     def get_price(self, shop_id: int, nm_id: int) -> Optional[float]:
@@ -240,19 +392,45 @@ class RedisStateManager:
     def get_ozon_campaign_state(self, shop_id: int, campaign_id: int) -> Dict[str, Any]:
         """
         Get last state for an Ozon campaign.
-        Returns dict with bids (sku→bid_rub), status, budget, items.
+        Returns dict with bids (int sku→bid_rub), status, budget, items (int skus).
         """
         key = self._ozon_key(shop_id, campaign_id)
-        raw = self.client.hgetall(key)
+        return self._parse_ozon_state(self.client.hgetall(key))
 
+    def get_ozon_campaign_states_bulk(
+        self, shop_id: int, campaign_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Get last state of many Ozon campaigns in one pipeline.
+        
+        Returns:
+            {campaign_id: get_ozon_campaign_state() dict}
+        """
+        campaign_ids = list(campaign_ids)
+        if not campaign_ids:
+            return {}
+        
+        pipe = self.client.pipeline(transaction=False)
+        for campaign_id in campaign_ids:
+            pipe.hgetall(self._ozon_key(shop_id, campaign_id))
+        
+        return {
+            campaign_id: self._parse_ozon_state(raw)
+            for campaign_id, raw in zip(campaign_ids, pipe.execute())
+        }
+
+    @staticmethod
+    def _parse_ozon_state(raw: Dict[str, str]) -> Dict[str, Any]:
+        """Decode an Ozon campaign HGETALL result."""
         if not raw:
             return {"bids": {}, "status": None, "budget": None, "items": []}
 
+        # JSON object keys are strings: convert SKUs to int once here
         bids = {}
         if raw.get("bids"):
             try:
-                bids = json.loads(raw["bids"])
-            except json.JSONDecodeError:
+                bids = {int(sku): bid for sku, bid in orjson.loads(raw["bids"]).items()}
+            except (orjson.JSONDecodeError, ValueError):
                 bids = {}
 
         status = raw.get("status")
@@ -261,8 +439,8 @@ class RedisStateManager:
         items = []
         if raw.get("items"):
             try:
-                items = json.loads(raw["items"])
-            except json.JSONDecodeError:
+                items = [int(sku) for sku in orjson.loads(raw["items"])]
+            except (orjson.JSONDecodeError, ValueError):
                 items = []
 
         return {
@@ -276,7 +454,7 @@ class RedisStateManager:
         self,
         shop_id: int,
         campaign_id: int,
-        bids: Optional[Dict[str, float]] = None,
+        bids: Optional[Dict[int, float]] = None,
         status: Optional[str] = None,
         budget: Optional[float] = None,
         items: Optional[List[int]] = None,
@@ -286,17 +464,54 @@ class RedisStateManager:
         Only updates fields that are not None.
         """
         key = self._ozon_key(shop_id, campaign_id)
+        mapping = self._ozon_state_mapping(bids, status, budget, items)
+
+        if mapping:
+            self.client.hset(key, mapping=mapping)
+            self.client.expire(key, self.OZON_ADS_TTL)
+
+    def set_ozon_campaign_states_bulk(
+        self, shop_id: int, updates: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """
+        Update many Ozon campaign states in one pipeline.
+        
+        Args:
+            updates: {campaign_id: set_ozon_campaign_state() keyword args}
+        """
+        pipe = self.client.pipeline(transaction=False)
+        queued = False
+        for campaign_id, fields in updates.items():
+            mapping = self._ozon_state_mapping(**fields)
+            if not mapping:
+                continue
+            key = self._ozon_key(shop_id, campaign_id)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.OZON_ADS_TTL)
+            queued = True
+        
+        if queued:
+            pipe.execute()
 
+    @staticmethod
+    def _ozon_state_mapping(
+        bids: Optional[Dict[int, float]] = None,
+        status: Optional[str] = None,
+        budget: Optional[float] = None,
+        items: Optional[List[int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        HSET mapping for the Ozon campaign fields that are not None.
+        
+        bids/items are orjson bytes (redis-py accepts bytes values as-is).
+        """
         mapping = {}
         if bids is not None:
-            mapping["bids"] = json.dumps(bids)
+            mapping["bids"] = orjson.dumps(bids, option=orjson.OPT_NON_STR_KEYS)
         if status is not None:
             mapping["status"] = str(status)
         if budget is not None:
             mapping["budget"] = str(budget)
         if items is not None:
-            mapping["items"] = json.dumps(items)
-
-        if mapping:
-            self.client.hset(key, mapping=mapping)
-            self.client.expire(key, self.OZON_ADS_TTL)
+            mapping["items"] = orjson.dumps(items)
+        return mapping
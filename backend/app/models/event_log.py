@@ -2,12 +2,29 @@
 EventLog model for tracking advertising events (bid changes, status changes, etc.)
 """
 from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
 from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, JSON
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 
+class EventRecord(NamedTuple):
+    """
+    Detected event ready for event_log insertion.
+    
+    Tuple-based (no per-event dict): field order matches the INSERT column
+    order, so records can be passed to executemany as-is.
+    """
+    shop_id: int
+    advert_id: int
+    nm_id: Optional[int]
+    event_type: str
+    old_value: Optional[str]
+    new_value: Optional[str]
+    event_metadata: Optional[Dict[str, Any]]
+
+
 class EventLog(Base):
     """
     Stores advertising events for timeline visualization.
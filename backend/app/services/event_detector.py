@@ -6,15 +6,65 @@ Detects changes in campaign settings and logs them to PostgreSQL event_log.
 CRITICAL: Implements event debouncing to avoid garbage events from API "storms".
 """
 import logging
-from typing import Dict, Any, List, Optional, Tuple, Set
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple, Set
 from decimal import Decimal
 from datetime import datetime
 
-from app.core.redis_state import RedisStateManager
-from app.models.event_log import EventLog
+from app.core.redis_state import AdvertStateUpdate, AdvertsSnapshot, RedisStateManager
+from app.models.event_log import EventLog, EventRecord
 
 logger = logging.getLogger(__name__)
 
+# Ad event types (shared module-level objects, not rebuilt per event)
+EVENT_BID_CHANGE = "BID_CHANGE"
+EVENT_STATUS_CHANGE = "STATUS_CHANGE"
+EVENT_ITEM_ADD = "ITEM_ADD"
+EVENT_ITEM_REMOVE = "ITEM_REMOVE"
+EVENT_ITEM_INACTIVE = "ITEM_INACTIVE"
+
+# Commercial and content event types
+EVENT_PRICE_CHANGE = "PRICE_CHANGE"
+EVENT_STOCK_OUT = "STOCK_OUT"
+EVENT_STOCK_REPLENISH = "STOCK_REPLENISH"
+EVENT_CONTENT_CHANGE = "CONTENT_CHANGE"
+EVENT_CONTENT_TITLE_CHANGED = "CONTENT_TITLE_CHANGED"
+EVENT_CONTENT_DESC_CHANGED = "CONTENT_DESC_CHANGED"
+EVENT_CONTENT_MAIN_PHOTO_CHANGED = "CONTENT_MAIN_PHOTO_CHANGED"
+EVENT_CONTENT_PHOTO_ORDER_CHANGED = "CONTENT_PHOTO_ORDER_CHANGED"
+
+# Metadata templates for V2 BID_CHANGE; per-event dict = template | {"campaign_type": ...}
+_META_BID_SEARCH = {"bid_field": "search", "unit": "kopecks"}
+_META_BID_RECO = {"bid_field": "recommendations", "unit": "kopecks"}
+
+# ContentEventDetector: hashes compared between a fresh card and dim_product_content
+CONTENT_HASH_FIELDS = ("title_hash", "description_hash", "main_photo_id", "photos_hash")
+_content_hashes = itemgetter(*CONTENT_HASH_FIELDS)
+
+
+class NmBidV2(NamedTuple):
+    """Per-nm_id bids from V2 nm_settings (kopecks)."""
+    nm_id: int
+    bid_search: int
+    bid_recommendations: int
+
+
+class AdvertV2(NamedTuple):
+    """Advert from /api/advert/v2/adverts, decoded once by parse_adverts_v2()."""
+    advert_id: int
+    status: int
+    bid_type: str
+    payment_type: str
+    search_enabled: int
+    recommendations_enabled: int
+    nm_bids: List[NmBidV2]
+
+    @property
+    def max_search_bid(self) -> int:
+        """Max search bid across nm_ids (CPM equivalent, kopecks)."""
+        return max((nm.bid_search for nm in self.nm_bids), default=0)
+
 
 class EventDetector:
     """
@@ -40,7 +90,7 @@ class EventDetector:
         self,
         shop_id: int,
         campaign_settings: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         [LEGACY] Detect changes using V1 format (/adv/v1/promotion/adverts).
         
@@ -51,9 +101,10 @@ class EventDetector:
             campaign_settings: Response from POST /adv/v1/promotion/adverts
             
         Returns:
-            List of event dicts ready for PostgreSQL insertion
+            List of EventRecord ready for PostgreSQL insertion
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
         
         for campaign in campaign_settings:
             try:
@@ -69,9 +120,10 @@ class EventDetector:
                 raw_cpm = self._extract_cpm(campaign)
                 
                 # DEBOUNCING: Skip if API returned garbage (None, empty, or 0 for CPM)
+                # CPM is kept in integer kopecks: exact comparison, no float drift
                 current_cpm = None
                 if raw_cpm is not None and raw_cpm > 0:
-                    current_cpm = Decimal(str(raw_cpm))
+                    current_cpm = int(round(raw_cpm * 100))
                 
                 current_status = None
                 if raw_status is not None and raw_status != "":
@@ -87,31 +139,39 @@ class EventDetector:
                 
                 # ===== Detect BID_CHANGE (with debouncing) =====
                 if current_cpm is not None:  # Only if we got valid CPM
-                    if old_cpm is not None and float(current_cpm) != old_cpm:
-                        events.append({
-                            "shop_id": shop_id,
-                            "advert_id": advert_id,
-                            "nm_id": None,
-                            "event_type": "BID_CHANGE",
-                            "old_value": str(old_cpm),
-                            "new_value": str(current_cpm),
-                            "event_metadata": {"campaign_type": campaign_type}
-                        })
-                        logger.info(f"Detected BID_CHANGE: advert={advert_id} {old_cpm} -> {current_cpm}")
+                    if old_cpm is not None and current_cpm != old_cpm:
+                        events.append(EventRecord(
+                            shop_id=shop_id,
+                            advert_id=advert_id,
+                            nm_id=None,
+                            event_type=EVENT_BID_CHANGE,
+                            old_value=self._kopecks_to_rub(old_cpm),
+                            new_value=self._kopecks_to_rub(current_cpm),
+                            event_metadata={"campaign_type": campaign_type}
+                        ))
+                        if log_events:
+                            logger.info(
+                                "Detected BID_CHANGE: advert=%s %s -> %s kopecks",
+                                advert_id, old_cpm, current_cpm,
+                            )
                 
                 # ===== Detect STATUS_CHANGE =====
                 if current_status is not None:  # Only if we got valid status
                     if old_status is not None and current_status != old_status:
-                        events.append({
-                            "shop_id": shop_id,
-                            "advert_id": advert_id,
-                            "nm_id": None,
-                            "event_type": "STATUS_CHANGE",
-                            "old_value": str(old_status),
-                            "new_value": str(current_status),
-                            "event_metadata": None
-                        })
-                        logger.info(f"Detected STATUS_CHANGE: advert={advert_id} {old_status} -> {current_status}")
+                        events.append(EventRecord(
+                            shop_id=shop_id,
+                            advert_id=advert_id,
+                            nm_id=None,
+                            event_type=EVENT_STATUS_CHANGE,
+                            old_value=str(old_status),
+                            new_value=str(current_status),
+                            event_metadata=None
+                        ))
+                        if log_events:
+                            logger.info(
+                                "Detected STATUS_CHANGE: advert=%s %s -> %s",
+                                advert_id, old_status, current_status,
+                            )
                 
                 # ===== Detect ITEM_ADD / ITEM_REMOVE =====
                 old_items = set(old_state.get("items") or [])
@@ -121,33 +181,35 @@ class EventDetector:
                 removed_items = old_items - current_items_set
                 
                 for nm_id in added_items:
-                    events.append({
-                        "shop_id": shop_id,
-                        "advert_id": advert_id,
-                        "nm_id": nm_id,
-                        "event_type": "ITEM_ADD",
-                        "old_value": None,
-                        "new_value": str(nm_id),
-                        "event_metadata": None
-                    })
-                    logger.info(f"Detected ITEM_ADD: advert={advert_id} nm={nm_id}")
+                    events.append(EventRecord(
+                        shop_id=shop_id,
+                        advert_id=advert_id,
+                        nm_id=nm_id,
+                        event_type=EVENT_ITEM_ADD,
+                        old_value=None,
+                        new_value=str(nm_id),
+                        event_metadata=None
+                    ))
+                    if log_events:
+                        logger.info("Detected ITEM_ADD: advert=%s nm=%s", advert_id, nm_id)
                 
                 for nm_id in removed_items:
-                    events.append({
-                        "shop_id": shop_id,
-                        "advert_id": advert_id,
-                        "nm_id": nm_id,
-                        "event_type": "ITEM_REMOVE",
-                        "old_value": str(nm_id),
-                        "new_value": None,
-                        "event_metadata": None
-                    })
-                    logger.info(f"Detected ITEM_REMOVE: advert={advert_id} nm={nm_id}")
+                    events.append(EventRecord(
+                        shop_id=shop_id,
+                        advert_id=advert_id,
+                        nm_id=nm_id,
+                        event_type=EVENT_ITEM_REMOVE,
+                        old_value=str(nm_id),
+                        new_value=None,
+                        event_metadata=None
+                    ))
+                    if log_events:
+                        logger.info("Detected ITEM_REMOVE: advert=%s nm=%s", advert_id, nm_id)
                 
                 # ===== Update Redis state (only with valid values) =====
                 self.state_manager.set_state(
                     shop_id, advert_id,
-                    cpm=float(current_cpm) if current_cpm is not None else None,
+                    cpm=current_cpm,
                     status=current_status,
                     items=current_items if current_items else None,
                     campaign_type=campaign_type
@@ -157,7 +219,7 @@ class EventDetector:
                 logger.warning(f"Error processing campaign {campaign.get('advertId')}: {e}")
                 continue
         
-        logger.info(f"Detected {len(events)} events total")
+        logger.info("Detected %d events total", len(events))
         return events
     
     def detect_inactive_items(
@@ -166,8 +228,9 @@ class EventDetector:
         advert_id: int,
         campaign_status: int,
         official_items: Set[int],
-        stats_items: Dict[int, int]  # nm_id -> views
-    ) -> List[Dict[str, Any]]:
+        stats_items: Dict[int, int],  # nm_id -> views
+        snapshot: Optional[AdvertsSnapshot] = None,
+    ) -> List[EventRecord]:
         """
         Detect ITEM_INACTIVE events.
         
@@ -175,32 +238,49 @@ class EventDetector:
         1. Campaign is active (status in [9, 11])
         2. Item is in official campaign list
         3. Item had views before but now has 0 views
+        
+        Pass the snapshot from get_snapshot_v2(..., views_items=...) to reuse
+        the detect_changes_v2 pipeline; otherwise last views are read in one
+        MGET. New views are written back in one pipeline.
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
         
         # Only check for active campaigns
         if campaign_status not in [9, 11]:
             return events
         
+        if snapshot is None:
+            snapshot = self.state_manager.get_adverts_snapshot(
+                shop_id, {}, views_items={advert_id: official_items}
+            )
+        
+        current_views_map = {}
         for nm_id in official_items:
             current_views = stats_items.get(nm_id, 0)
-            old_views = self.state_manager.get_last_views(shop_id, advert_id, nm_id)
+            old_views = snapshot.views.get((advert_id, nm_id))
             
             # ITEM_INACTIVE: Had views before, now has 0
             if old_views is not None and old_views > 0 and current_views == 0:
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": advert_id,
-                    "nm_id": nm_id,
-                    "event_type": "ITEM_INACTIVE",
-                    "old_value": str(old_views),
-                    "new_value": "0",
-                    "event_metadata": {"reason": "views_dropped_to_zero"}
-                })
-                logger.info(f"Detected ITEM_INACTIVE: advert={advert_id} nm={nm_id} views {old_views} -> 0")
+                events.append(EventRecord(
+                    shop_id=shop_id,
+                    advert_id=advert_id,
+                    nm_id=nm_id,
+                    event_type=EVENT_ITEM_INACTIVE,
+                    old_value=str(old_views),
+                    new_value="0",
+                    event_metadata={"reason": "views_dropped_to_zero"}
+                ))
+                if log_events:
+                    logger.info(
+                        "Detected ITEM_INACTIVE: advert=%s nm=%s views %s -> 0",
+                        advert_id, nm_id, old_views,
+                    )
             
-            # Update last views
-            self.state_manager.set_last_views(shop_id, advert_id, nm_id, current_views)
+            current_views_map[nm_id] = current_views
+        
+        # Update last views
+        self.state_manager.set_last_views_bulk(shop_id, advert_id, current_views_map)
         
         return events
     
@@ -242,6 +322,11 @@ class EventDetector:
         
         return items
     
+    @staticmethod
+    def _kopecks_to_rub(kopecks: int) -> str:
+        """Format integer kopecks as roubles for event values (API boundary)."""
+        return str(Decimal(kopecks).scaleb(-2))
+    
     def _extract_cpm(self, campaign: Dict[str, Any]) -> Optional[float]:
         """Extract CPM/bid from campaign settings."""
         # New format: unitedParams[0].searchCPM or catalogCPM
@@ -332,23 +417,16 @@ class EventDetector:
         
         return campaign_items, cpm_values, campaign_types
     
-    def extract_bid_snapshot_v2(
-        self,
-        shop_id: int,
-        adverts_v2: List[Dict[str, Any]]
-    ) -> List[tuple]:
+    def parse_adverts_v2(self, adverts_v2: List[Dict[str, Any]]) -> List[AdvertV2]:
         """
-        Extract bid snapshot rows from V2 API response for log_wb_bids.
-        
-        V2 format: each advert has nm_settings[] with bids_kopecks per nm_id.
-        All fields are None-safe (API may return None for any field).
+        Decode raw /api/advert/v2/adverts items into typed AdvertV2 records.
         
-        Returns list of tuples:
-            (shop_id, advert_id, nm_id, bid_type, payment_type,
-             bid_search, bid_recommendations, search_enabled,
-             recommendations_enabled, status)
+        All None-coercion (`.get(...) or 0`) happens here, once per response;
+        the V2 extract/detect methods below only use attribute access.
+        Adverts without id, nm_settings without nm_id and malformed
+        entries are dropped.
         """
-        rows = []
+        parsed = []
         
         for advert in adverts_v2:
             try:
@@ -356,51 +434,118 @@ class EventDetector:
                 if not advert_id:
                     continue
                 
-                bid_type = str(advert.get("bid_type") or "")
-                status = int(advert.get("status") or 0)
-                
                 settings = advert.get("settings") or {}
-                payment_type = str(settings.get("payment_type") or "")
                 placements = settings.get("placements") or {}
-                search_enabled = 1 if placements.get("search") else 0
-                recommendations_enabled = 1 if placements.get("recommendations") else 0
                 
-                nm_settings = advert.get("nm_settings") or []
-                for nm_setting in nm_settings:
+                nm_bids = []
+                for nm_setting in advert.get("nm_settings") or []:
                     if not isinstance(nm_setting, dict):
                         continue
                     nm_id = int(nm_setting.get("nm_id") or 0)
                     if not nm_id:
                         continue
-                    
                     bids = nm_setting.get("bids_kopecks") or {}
-                    bid_search = int(bids.get("search") or 0)
-                    bid_recommendations = int(bids.get("recommendations") or 0)
-                    
-                    rows.append((
-                        shop_id,
-                        advert_id,
+                    nm_bids.append(NmBidV2(
                         nm_id,
-                        bid_type,
-                        payment_type,
-                        bid_search,
-                        bid_recommendations,
-                        search_enabled,
-                        recommendations_enabled,
-                        status,
+                        int(bids.get("search") or 0),
+                        int(bids.get("recommendations") or 0),
                     ))
+                
+                parsed.append(AdvertV2(
+                    advert_id=advert_id,
+                    status=int(advert.get("status") or 0),
+                    bid_type=str(advert.get("bid_type") or ""),
+                    payment_type=str(settings.get("payment_type") or ""),
+                    search_enabled=1 if placements.get("search") else 0,
+                    recommendations_enabled=1 if placements.get("recommendations") else 0,
+                    nm_bids=nm_bids,
+                ))
             except Exception as e:
-                logger.warning(f"Error extracting V2 bid snapshot for advert {advert.get('id')}: {e}")
+                logger.warning(f"Error parsing V2 advert {advert.get('id')}: {e}")
                 continue
         
-        return rows
+        return parsed
+
+    def extract_bid_snapshot_v2(
+        self,
+        shop_id: int,
+        adverts: List[AdvertV2]
+    ) -> List[List[Any]]:
+        """
+        Extract bid snapshot for log_wb_bids from parsed V2 adverts.
+        
+        Built column-oriented (one list per column) so the loader can insert
+        without per-row tuples; advert-level values are filled with a single
+        list repeat per advert. Column order:
+            shop_id, advert_id, nm_id, bid_type, payment_type,
+            bid_search, bid_recommendations, search_enabled,
+            recommendations_enabled, status
+        
+        Args:
+            adverts: Output of parse_adverts_v2()
+        
+        Returns:
+            List of 10 column lists, or [] if there are no rows.
+        """
+        advert_ids, nm_ids, bid_types, payment_types = [], [], [], []
+        bids_search, bids_reco, search_flags, reco_flags, statuses = [], [], [], [], []
+        
+        for advert in adverts:
+            n = len(advert.nm_bids)
+            for nm in advert.nm_bids:
+                nm_ids.append(nm.nm_id)
+                bids_search.append(nm.bid_search)
+                bids_reco.append(nm.bid_recommendations)
+            
+            advert_ids.extend([advert.advert_id] * n)
+            bid_types.extend([advert.bid_type] * n)
+            payment_types.extend([advert.payment_type] * n)
+            search_flags.extend([advert.search_enabled] * n)
+            reco_flags.extend([advert.recommendations_enabled] * n)
+            statuses.extend([advert.status] * n)
+        
+        if not nm_ids:
+            return []
+        
+        return [
+            [shop_id] * len(nm_ids),
+            advert_ids,
+            nm_ids,
+            bid_types,
+            payment_types,
+            bids_search,
+            bids_reco,
+            search_flags,
+            reco_flags,
+            statuses,
+        ]
+
+    def get_snapshot_v2(
+        self,
+        shop_id: int,
+        adverts: List[AdvertV2],
+        views_items: Optional[Dict[int, Set[int]]] = None,
+    ) -> AdvertsSnapshot:
+        """
+        Read all Redis state needed by detect_changes_v2 in one pipeline.
+        
+        Args:
+            views_items: {advert_id: official nm_ids} to also prefetch last
+                         views for detect_inactive_items in the same round-trip
+        """
+        return self.state_manager.get_adverts_snapshot(
+            shop_id,
+            {advert.advert_id: [nm.nm_id for nm in advert.nm_bids] for advert in adverts},
+            views_items=views_items,
+        )
 
     def detect_changes_v2(
         self,
         shop_id: int,
-        adverts_v2: List[Dict[str, Any]],
+        adverts: List[AdvertV2],
         campaign_type_map: Dict[int, int] = None,
-    ) -> List[Dict[str, Any]]:
+        snapshot: Optional[AdvertsSnapshot] = None,
+    ) -> List[EventRecord]:
         """
         Detect changes using V2 API format (/api/advert/v2/adverts).
         
@@ -409,169 +554,206 @@ class EventDetector:
         - Uses bids_kopecks (search/recommendations) instead of CPM
         - Direct access to payment_type, bid_type, placements
         
+        Redis is read once (pipelined snapshot, see get_snapshot_v2) before
+        detection and written once after it. Adverts without Redis state (first
+        scan) report ITEM_ADD for each current nm_id; status and bids are
+        compared from the next scan on.
+        
         Args:
             shop_id: Shop ID
-            adverts_v2: Response from GET /api/advert/v2/adverts
+            adverts: Output of parse_adverts_v2()
             campaign_type_map: advert_id -> type (from /adv/v1/promotion/count)
+            snapshot: Pre-fetched get_snapshot_v2() result (e.g. shared with
+                      detect_inactive_items); fetched here if omitted
             
         Returns:
-            List of event dicts ready for PostgreSQL insertion
+            List of EventRecord ready for PostgreSQL insertion
         """
-        events = []
         type_map = campaign_type_map or {}
         
-        for advert in adverts_v2:
-            try:
-                advert_id = int(advert.get("id") or 0)
-                if not advert_id:
-                    continue
-                
-                # Parse current values
-                status = int(advert.get("status") or 0)
-                campaign_type = type_map.get(advert_id, 0)
-                
-                # ===== STATUS_CHANGE =====
-                old_state = self.state_manager.get_state(shop_id, advert_id)
-                old_status = old_state.get("status")
-                
-                if old_status is not None and status != old_status:
-                    events.append({
-                        "shop_id": shop_id,
-                        "advert_id": advert_id,
-                        "nm_id": None,
-                        "event_type": "STATUS_CHANGE",
-                        "old_value": str(old_status),
-                        "new_value": str(status),
-                        "event_metadata": None
-                    })
-                    logger.info(f"Detected STATUS_CHANGE: advert={advert_id} {old_status} -> {status}")
-                
-                # ===== BID_CHANGE per nm_id =====
-                nm_settings = advert.get("nm_settings") or []
-                current_items = []
+        if snapshot is None:
+            snapshot = self.get_snapshot_v2(shop_id, adverts)
+        
+        # Adverts are already validated by parse_adverts_v2, so the detection
+        # pass has no per-advert error handling; one guard covers the batch
+        # and leaves Redis state untouched so the next run re-detects.
+        try:
+            events, updates = self._detect_chunk(shop_id, adverts, snapshot, type_map)
+        except Exception:
+            logger.exception(f"V2 detection failed for shop {shop_id}")
+            return []
+        
+        self.state_manager.set_adverts_bulk(shop_id, updates)
+        
+        logger.info("Detected %d events total (V2)", len(events))
+        return events
+
+    @staticmethod
+    def _detect_chunk(
+        shop_id: int,
+        adverts: List[AdvertV2],
+        snapshot: AdvertsSnapshot,
+        type_map: Dict[int, int],
+    ) -> Tuple[List[EventRecord], List[AdvertStateUpdate]]:
+        """
+        Compare adverts against a pre-fetched Redis snapshot.
+        
+        Pure function (no Redis access).
+        
+        Returns:
+            (events, state updates to flush via set_adverts_bulk)
+        """
+        events = []
+        updates = []
+        log_events = logger.isEnabledFor(logging.INFO)
+        
+        for advert in adverts:
+            advert_id = advert.advert_id
+            status = advert.status
+            campaign_type = type_map.get(advert_id, 0)
+            bids = {nm.nm_id: (nm.bid_search, nm.bid_recommendations) for nm in advert.nm_bids}
+            max_bid = advert.max_search_bid
+            
+            update = AdvertStateUpdate(
+                advert_id=advert_id,
+                bids=bids,
+                cpm=max_bid if max_bid > 0 else None,
+                status=status,
+                items=list(bids) if bids else None,
+                campaign_type=campaign_type,
+            )
+            
+            old_state = snapshot.states[advert_id]
+            
+            # ===== First observation: no status/bids to compare, every item is new =====
+            if old_state["status"] is None and not old_state["items"]:
+                events.extend([
+                    EventRecord(
+                        shop_id=shop_id,
+                        advert_id=advert_id,
+                        nm_id=nm_id,
+                        event_type=EVENT_ITEM_ADD,
+                        old_value=None,
+                        new_value=str(nm_id),
+                        event_metadata=None
+                    )
+                    for nm_id in bids
+                ])
+                if log_events:
+                    for nm_id in bids:
+                        logger.info("Detected ITEM_ADD: advert=%s nm=%s", advert_id, nm_id)
+                updates.append(update)
+                continue
+            
+            # ===== STATUS_CHANGE =====
+            old_status = old_state.get("status")
+            
+            if old_status is not None and status != old_status:
+                events.append(EventRecord(
+                    shop_id=shop_id,
+                    advert_id=advert_id,
+                    nm_id=None,
+                    event_type=EVENT_STATUS_CHANGE,
+                    old_value=str(old_status),
+                    new_value=str(status),
+                    event_metadata=None
+                ))
+                if log_events:
+                    logger.info(
+                        "Detected STATUS_CHANGE: advert=%s %s -> %s",
+                        advert_id, old_status, status,
+                    )
+            
+            # ===== BID_CHANGE per nm_id =====
+            for nm_id, (bid_search, bid_reco) in bids.items():
+                old_bid_search, old_bid_reco = snapshot.bids.get((advert_id, nm_id), (None, None))
                 
-                for nm_setting in nm_settings:
-                    if not isinstance(nm_setting, dict):
-                        continue
-                    nm_id = int(nm_setting.get("nm_id") or 0)
-                    if not nm_id:
-                        continue
-                    
-                    current_items.append(nm_id)
-                    
-                    bids = nm_setting.get("bids_kopecks") or {}
-                    bid_search = int(bids.get("search") or 0)
-                    bid_reco = int(bids.get("recommendations") or 0)
-                    
-                    # Compare with Redis: per-nm_id bids
-                    old_bid_search = self.state_manager.get_bid(shop_id, advert_id, nm_id, "search")
-                    old_bid_reco = self.state_manager.get_bid(shop_id, advert_id, nm_id, "recommendations")
-                    
-                    if old_bid_search is not None and bid_search != old_bid_search:
-                        events.append({
-                            "shop_id": shop_id,
-                            "advert_id": advert_id,
-                            "nm_id": nm_id,
-                            "event_type": "BID_CHANGE",
-                            "old_value": str(old_bid_search),
-                            "new_value": str(bid_search),
-                            "event_metadata": {
-                                "bid_field": "search",
-                                "campaign_type": campaign_type,
-                                "unit": "kopecks",
-                            }
-                        })
+                if old_bid_search is not None and bid_search != old_bid_search:
+                    events.append(EventRecord(
+                        shop_id=shop_id,
+                        advert_id=advert_id,
+                        nm_id=nm_id,
+                        event_type=EVENT_BID_CHANGE,
+                        old_value=str(old_bid_search),
+                        new_value=str(bid_search),
+                        event_metadata=_META_BID_SEARCH | {"campaign_type": campaign_type}
+                    ))
+                    if log_events:
                         logger.info(
-                            f"Detected BID_CHANGE (search): advert={advert_id} "
-                            f"nm={nm_id} {old_bid_search} -> {bid_search} kopecks"
+                            "Detected BID_CHANGE (search): advert=%s nm=%s %s -> %s kopecks",
+                            advert_id, nm_id, old_bid_search, bid_search,
                         )
-                    
-                    if old_bid_reco is not None and bid_reco != old_bid_reco:
-                        events.append({
-                            "shop_id": shop_id,
-                            "advert_id": advert_id,
-                            "nm_id": nm_id,
-                            "event_type": "BID_CHANGE",
-                            "old_value": str(old_bid_reco),
-                            "new_value": str(bid_reco),
-                            "event_metadata": {
-                                "bid_field": "recommendations",
-                                "campaign_type": campaign_type,
-                                "unit": "kopecks",
-                            }
-                        })
+                
+                if old_bid_reco is not None and bid_reco != old_bid_reco:
+                    events.append(EventRecord(
+                        shop_id=shop_id,
+                        advert_id=advert_id,
+                        nm_id=nm_id,
+                        event_type=EVENT_BID_CHANGE,
+                        old_value=str(old_bid_reco),
+                        new_value=str(bid_reco),
+                        event_metadata=_META_BID_RECO | {"campaign_type": campaign_type}
+                    ))
+                    if log_events:
                         logger.info(
-                            f"Detected BID_CHANGE (recommendations): advert={advert_id} "
-                            f"nm={nm_id} {old_bid_reco} -> {bid_reco} kopecks"
+                            "Detected BID_CHANGE (recommendations): advert=%s nm=%s "
+                            "%s -> %s kopecks",
+                            advert_id, nm_id, old_bid_reco, bid_reco,
                         )
-                    
-                    # Update per-nm_id bid state in Redis
-                    self.state_manager.set_bid(shop_id, advert_id, nm_id, "search", bid_search)
-                    self.state_manager.set_bid(shop_id, advert_id, nm_id, "recommendations", bid_reco)
-                
-                # ===== ITEM_ADD / ITEM_REMOVE =====
-                old_items = set(old_state.get("items") or [])
-                current_items_set = set(current_items)
-                
-                for nm_id in current_items_set - old_items:
-                    events.append({
-                        "shop_id": shop_id,
-                        "advert_id": advert_id,
-                        "nm_id": nm_id,
-                        "event_type": "ITEM_ADD",
-                        "old_value": None,
-                        "new_value": str(nm_id),
-                        "event_metadata": None
-                    })
-                    logger.info(f"Detected ITEM_ADD: advert={advert_id} nm={nm_id}")
-                
-                for nm_id in old_items - current_items_set:
-                    events.append({
-                        "shop_id": shop_id,
-                        "advert_id": advert_id,
-                        "nm_id": nm_id,
-                        "event_type": "ITEM_REMOVE",
-                        "old_value": str(nm_id),
-                        "new_value": None,
-                        "event_metadata": None
-                    })
-                    logger.info(f"Detected ITEM_REMOVE: advert={advert_id} nm={nm_id}")
-                
-                # ===== Update Redis state =====
-                # Use max bid as CPM equivalent for backward compat
-                max_bid = Decimal(0)
-                for nm_s in nm_settings:
-                    if isinstance(nm_s, dict):
-                        b = nm_s.get("bids_kopecks") or {}
-                        max_bid = max(max_bid, Decimal(str(int(b.get("search") or 0))))
-                
-                self.state_manager.set_state(
-                    shop_id, advert_id,
-                    cpm=float(max_bid) if max_bid > 0 else None,
-                    status=status,
-                    items=current_items if current_items else None,
-                    campaign_type=campaign_type
+            
+            # ===== ITEM_ADD / ITEM_REMOVE =====
+            # `bids` is already a hash index of current nm_ids: hash old items once
+            # and probe both ways instead of building two sets + two differences
+            old_items = dict.fromkeys(old_state.get("items") or [])
+            added = [nm for nm in bids if nm not in old_items]
+            removed = [nm for nm in old_items if nm not in bids]
+            
+            events.extend([
+                EventRecord(
+                    shop_id=shop_id,
+                    advert_id=advert_id,
+                    nm_id=nm_id,
+                    event_type=EVENT_ITEM_ADD,
+                    old_value=None,
+                    new_value=str(nm_id),
+                    event_metadata=None
+                )
+                for nm_id in added
+            ])
+            events.extend([
+                EventRecord(
+                    shop_id=shop_id,
+                    advert_id=advert_id,
+                    nm_id=nm_id,
+                    event_type=EVENT_ITEM_REMOVE,
+                    old_value=str(nm_id),
+                    new_value=None,
+                    event_metadata=None
                 )
+                for nm_id in removed
+            ])
+            if log_events:
+                for nm_id in added:
+                    logger.info("Detected ITEM_ADD: advert=%s nm=%s", advert_id, nm_id)
+                for nm_id in removed:
+                    logger.info("Detected ITEM_REMOVE: advert=%s nm=%s", advert_id, nm_id)
             
-            except Exception as e:
-                logger.warning(f"Error processing V2 advert {advert.get('id')}: {e}")
-                continue
+            updates.append(update)
         
-        logger.info(f"Detected {len(events)} events total (V2)")
-        return events
+        return events, updates
 
     def extract_all_campaign_data_v2(
         self,
-        adverts_v2: List[Dict[str, Any]],
+        adverts: List[AdvertV2],
         campaign_type_map: Dict[int, int] = None,
     ) -> Tuple[Dict[int, List[int]], Dict[int, Decimal], Dict[int, int]]:
         """
-        Extract campaign items, bid values, and types from V2 API response.
+        Extract campaign items, bid values, and types from parsed V2 adverts.
         
         Replaces extract_all_campaign_data() for V2 format.
         
         Args:
-            adverts_v2: Response from GET /api/advert/v2/adverts
+            adverts: Output of parse_adverts_v2()
             campaign_type_map: advert_id -> type (from /adv/v1/promotion/count)
         
         Returns:
@@ -584,35 +766,15 @@ class EventDetector:
         campaign_types = {}
         type_map = campaign_type_map or {}
         
-        for advert in adverts_v2:
-            try:
-                advert_id = int(advert.get("id") or 0)
-                if not advert_id:
-                    continue
-                
-                # Items from nm_settings
-                nm_settings = advert.get("nm_settings") or []
-                items = []
-                max_bid = 0
-                
-                for nm_s in nm_settings:
-                    if not isinstance(nm_s, dict):
-                        continue
-                    nm_id = int(nm_s.get("nm_id") or 0)
-                    if nm_id:
-                        items.append(nm_id)
-                    
-                    bids = nm_s.get("bids_kopecks") or {}
-                    bid_search = int(bids.get("search") or 0)
-                    bid_reco = int(bids.get("recommendations") or 0)
-                    max_bid = max(max_bid, bid_search, bid_reco)
-                
-                campaign_items[advert_id] = items
-                cpm_values[advert_id] = Decimal(str(max_bid))
-                campaign_types[advert_id] = type_map.get(advert_id, 0)
-            except Exception as e:
-                logger.warning(f"Error extracting V2 campaign data for {advert.get('id')}: {e}")
-                continue
+        for advert in adverts:
+            advert_id = advert.advert_id
+            max_bid = 0
+            for nm in advert.nm_bids:
+                max_bid = max(max_bid, nm.bid_search, nm.bid_recommendations)
+            
+            campaign_items[advert_id] = [nm.nm_id for nm in advert.nm_bids]
+            cpm_values[advert_id] = Decimal(max_bid)
+            campaign_types[advert_id] = type_map.get(advert_id, 0)
         
         return campaign_items, cpm_values, campaign_types
 
@@ -638,13 +800,14 @@ class CommercialEventDetector:
         self,
         shop_id: int,
         prices_data: List[Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         Detect PRICE_CHANGE events.
         
         Compares current convertedPrice with Redis state:price:{shop_id}:{nm_id}.
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
 
         for item in prices_data:
             nm_id = item["nm_id"]
@@ -656,31 +819,32 @@ class CommercialEventDetector:
             old_price = self.state_manager.get_price(shop_id, nm_id)
 
             if old_price is not None and old_price != current_price:
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,  # Not ad-related
-                    "nm_id": nm_id,
-                    "event_type": "PRICE_CHANGE",
-                    "old_value": str(old_price),
-                    "new_value": str(current_price),
-                    "event_metadata": {
+                events.append(EventRecord(
+                    shop_id=shop_id,
+                    advert_id=0,  # Not ad-related
+                    nm_id=nm_id,
+                    event_type=EVENT_PRICE_CHANGE,
+                    old_value=str(old_price),
+                    new_value=str(current_price),
+                    event_metadata={
                         "vendor_code": item.get("vendor_code", ""),
                         "discount": item.get("discount", 0),
                     },
-                })
-                logger.info(
-                    f"Detected PRICE_CHANGE: nm={nm_id} "
-                    f"{old_price} -> {current_price}"
-                )
+                ))
+                if log_events:
+                    logger.info(
+                        "Detected PRICE_CHANGE: nm=%s %s -> %s",
+                        nm_id, old_price, current_price,
+                    )
 
-        logger.info(f"Detected {len(events)} PRICE_CHANGE events")
+        logger.info("Detected %d PRICE_CHANGE events", len(events))
         return events
 
     def detect_stock_events(
         self,
         shop_id: int,
         stocks_data: List[Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         Detect STOCK_OUT and STOCK_REPLENISH events.
         
@@ -688,6 +852,7 @@ class CommercialEventDetector:
         STOCK_REPLENISH: new - old >= 50  (large restock jump)
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
         REPLENISH_THRESHOLD = 50
 
         for item in stocks_data:
@@ -703,42 +868,45 @@ class CommercialEventDetector:
 
             # STOCK_OUT: was in stock, now gone
             if old_qty > 0 and current_qty == 0:
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "STOCK_OUT",
-                    "old_value": str(old_qty),
-                    "new_value": "0",
-                    "event_metadata": {"warehouse_name": warehouse},
-                })
-                logger.info(
-                    f"Detected STOCK_OUT: nm={nm_id} "
-                    f"warehouse={warehouse} ({old_qty} -> 0)"
-                )
+                events.append(EventRecord(
+                    shop_id=shop_id,
+                    advert_id=0,
+                    nm_id=nm_id,
+                    event_type=EVENT_STOCK_OUT,
+                    old_value=str(old_qty),
+                    new_value="0",
+                    event_metadata={"warehouse_name": warehouse},
+                ))
+                if log_events:
+                    logger.info(
+                        "Detected STOCK_OUT: nm=%s warehouse=%s (%s -> 0)",
+                        nm_id, warehouse, old_qty,
+                    )
 
             # STOCK_REPLENISH: large restock jump
             elif current_qty - old_qty >= REPLENISH_THRESHOLD:
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "STOCK_REPLENISH",
-                    "old_value": str(old_qty),
-                    "new_value": str(current_qty),
-                    "event_metadata": {
+                events.append(EventRecord(
+                    shop_id=shop_id,
+                    advert_id=0,
+                    nm_id=nm_id,
+                    event_type=EVENT_STOCK_REPLENISH,
+                    old_value=str(old_qty),
+                    new_value=str(current_qty),
+                    event_metadata={
                         "warehouse_name": warehouse,
                         "delta": current_qty - old_qty,
                     },
-                })
-                logger.info(
-                    f"Detected STOCK_REPLENISH: nm={nm_id} "
-                    f"warehouse={warehouse} ({old_qty} -> {current_qty})"
-                )
+                ))
+                if log_events:
+                    logger.info(
+                        "Detected STOCK_REPLENISH: nm=%s warehouse=%s (%s -> %s)",
+                        nm_id, warehouse, old_qty, current_qty,
+                    )
 
+        counts = Counter(e.event_type for e in events)
         logger.info(
-            f"Detected {len([e for e in events if e['event_type'] == 'STOCK_OUT'])} STOCK_OUT "
-            f"and {len([e for e in events if e['event_type'] == 'STOCK_REPLENISH'])} STOCK_REPLENISH events"
+            "Detected %d STOCK_OUT and %d STOCK_REPLENISH events",
+            counts[EVENT_STOCK_OUT], counts[EVENT_STOCK_REPLENISH],
         )
         return events
 
@@ -746,11 +914,12 @@ class CommercialEventDetector:
         self,
         shop_id: int,
         cards_data: List[Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         Detect CONTENT_CHANGE events (main image URL changed).
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
 
         for card in cards_data:
             nm_id = card["nm_id"]
@@ -762,18 +931,19 @@ class CommercialEventDetector:
             old_url = self.state_manager.get_image_url(shop_id, nm_id)
 
             if old_url is not None and old_url != current_url:
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "CONTENT_CHANGE",
-                    "old_value": old_url,
-                    "new_value": current_url,
-                    "event_metadata": {"title": card.get("title", "")},
-                })
-                logger.info(f"Detected CONTENT_CHANGE: nm={nm_id}")
-
-        logger.info(f"Detected {len(events)} CONTENT_CHANGE events")
+                events.append(EventRecord(
+                    shop_id=shop_id,
+                    advert_id=0,
+                    nm_id=nm_id,
+                    event_type=EVENT_CONTENT_CHANGE,
+                    old_value=old_url,
+                    new_value=current_url,
+                    event_metadata={"title": card.get("title", "")},
+                ))
+                if log_events:
+                    logger.info("Detected CONTENT_CHANGE: nm=%s", nm_id)
+
+        logger.info("Detected %d CONTENT_CHANGE events", len(events))
         return events
 
     def detect_inactive_ads_by_stock(
@@ -781,7 +951,7 @@ class CommercialEventDetector:
         shop_id: int,
         stocks_data: List[Dict[str, Any]],
         active_campaign_items: Dict[int, List[int]],
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         Detect ITEM_INACTIVE events: all warehouse stocks = 0 but ad is running.
         
@@ -790,35 +960,34 @@ class CommercialEventDetector:
             active_campaign_items: {advert_id: [nm_id, ...]} for active campaigns
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
 
-        # Build total stock per nm_id across all warehouses
-        total_stock: Dict[int, int] = {}
-        for item in stocks_data:
-            nm_id = item["nm_id"]
-            total_stock[nm_id] = total_stock.get(nm_id, 0) + item["amount"]
+        # Stock amounts are non-negative, so the total across warehouses is 0
+        # exactly when no warehouse row has stock: no per-nm_id sum needed
+        in_stock = {item["nm_id"] for item in stocks_data if item["amount"]}
 
         # Check each active campaign's items
         for advert_id, nm_ids in active_campaign_items.items():
             for nm_id in nm_ids:
-                stock = total_stock.get(nm_id, 0)
-                if stock == 0:
-                    events.append({
-                        "shop_id": shop_id,
-                        "advert_id": advert_id,
-                        "nm_id": nm_id,
-                        "event_type": "ITEM_INACTIVE",
-                        "old_value": None,
-                        "new_value": "0",
-                        "event_metadata": {
+                if nm_id not in in_stock:
+                    events.append(EventRecord(
+                        shop_id=shop_id,
+                        advert_id=advert_id,
+                        nm_id=nm_id,
+                        event_type=EVENT_ITEM_INACTIVE,
+                        old_value=None,
+                        new_value="0",
+                        event_metadata={
                             "reason": "zero_stock_all_warehouses",
                         },
-                    })
-                    logger.info(
-                        f"Detected ITEM_INACTIVE (zero stock): "
-                        f"advert={advert_id} nm={nm_id}"
-                    )
+                    ))
+                    if log_events:
+                        logger.info(
+                            "Detected ITEM_INACTIVE (zero stock): advert=%s nm=%s",
+                            advert_id, nm_id,
+                        )
 
-        logger.info(f"Detected {len(events)} ITEM_INACTIVE events (zero stock)")
+        logger.info("Detected %d ITEM_INACTIVE events (zero stock)", len(events))
         return events
 
 
@@ -841,112 +1010,125 @@ class ContentEventDetector:
         self,
         shop_id: int,
         cards_data: List[Dict[str, Any]],
-        existing_hashes: Dict[int, Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
+        existing_hashes: Dict[int, Tuple],
+    ) -> List[EventRecord]:
         """
         Compare current card hashes with stored reference hashes.
         
         Args:
             shop_id: Shop ID
             cards_data: Fresh cards from WBContentService.fetch_all_cards()
-            existing_hashes: {nm_id: {title_hash, description_hash, 
-                             main_photo_id, photos_hash, photos_count}}
-                             from dim_product_content
+            existing_hashes: {nm_id: (title_hash, description_hash,
+                             main_photo_id, photos_hash, photos_count)}
+                             rows from dim_product_content
         
         Returns:
-            List of event dicts ready for event_log insertion.
+            List of EventRecord ready for event_log insertion.
         """
-        events = []
+        if not existing_hashes:
+            # First audit of the shop — nothing to compare against yet
+            logger.info(
+                "Content audit: no reference hashes, %d new products skipped",
+                len(cards_data),
+            )
+            return []
 
+        # Cards with a reference row whose hashes differ from it; most cards
+        # are unchanged between audits and drop out on one tuple compare.
+        # Reference row: (title_hash, description_hash, main_photo_id, photos_hash, photos_count)
+        changed = []
+        new_products = 0
         for card in cards_data:
-            nm_id = card["nm_id"]
-            old = existing_hashes.get(nm_id)
-
+            old = existing_hashes.get(card["nm_id"])
             if not old:
                 # First time seeing this product — no comparison possible
-                continue
+                new_products += 1
+            elif _content_hashes(card) != old[:4]:
+                changed.append((card, old))
 
-            # === CONTENT_TITLE_CHANGED ===
-            if (
-                card["title_hash"]
-                and old.get("title_hash")
-                and card["title_hash"] != old["title_hash"]
-            ):
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "CONTENT_TITLE_CHANGED",
-                    "old_value": old["title_hash"],
-                    "new_value": card["title_hash"],
-                    "event_metadata": {
-                        "new_title": card.get("title", "")[:200],  # Truncate for metadata
-                    },
-                })
-                logger.info(f"Detected CONTENT_TITLE_CHANGED: nm={nm_id}")
-
-            # === CONTENT_DESC_CHANGED ===
-            if (
-                card["description_hash"]
-                and old.get("description_hash")
-                and card["description_hash"] != old["description_hash"]
-            ):
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "CONTENT_DESC_CHANGED",
-                    "old_value": old["description_hash"],
-                    "new_value": card["description_hash"],
-                    "event_metadata": None,
-                })
-                logger.info(f"Detected CONTENT_DESC_CHANGED: nm={nm_id}")
-
-            # === CONTENT_MAIN_PHOTO_CHANGED ===
-            # Most important for CTR! Uses photo_id (not full URL)
-            if (
-                card["main_photo_id"]
-                and old.get("main_photo_id")
-                and card["main_photo_id"] != old["main_photo_id"]
-            ):
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "CONTENT_MAIN_PHOTO_CHANGED",
-                    "old_value": old["main_photo_id"],
-                    "new_value": card["main_photo_id"],
-                    "event_metadata": {
-                        "old_count": old.get("photos_count", 0),
-                        "new_count": card["photos_count"],
-                    },
-                })
-                logger.info(f"Detected CONTENT_MAIN_PHOTO_CHANGED: nm={nm_id}")
-
-            # === CONTENT_PHOTO_ORDER_CHANGED ===
-            # Detects added/removed/reordered secondary photos (affects CR)
-            # Only fires if main photo is unchanged (otherwise MAIN_PHOTO_CHANGED covers it)
-            elif (
-                card["photos_hash"]
-                and old.get("photos_hash")
-                and card["photos_hash"] != old["photos_hash"]
-            ):
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": 0,
-                    "nm_id": nm_id,
-                    "event_type": "CONTENT_PHOTO_ORDER_CHANGED",
-                    "old_value": old["photos_hash"],
-                    "new_value": card["photos_hash"],
-                    "event_metadata": {
-                        "old_count": old.get("photos_count", 0),
-                        "new_count": card["photos_count"],
-                    },
-                })
-                logger.info(f"Detected CONTENT_PHOTO_ORDER_CHANGED: nm={nm_id}")
+        # === CONTENT_TITLE_CHANGED ===
+        title_events = [
+            EventRecord(
+                shop_id=shop_id,
+                advert_id=0,
+                nm_id=card["nm_id"],
+                event_type=EVENT_CONTENT_TITLE_CHANGED,
+                old_value=old[0],
+                new_value=card["title_hash"],
+                event_metadata={
+                    "new_title": card.get("title", "")[:200],  # Truncate for metadata
+                },
+            )
+            for card, old in changed
+            if card["title_hash"] and old[0] and card["title_hash"] != old[0]
+        ]
+
+        # === CONTENT_DESC_CHANGED ===
+        desc_events = [
+            EventRecord(
+                shop_id=shop_id,
+                advert_id=0,
+                nm_id=card["nm_id"],
+                event_type=EVENT_CONTENT_DESC_CHANGED,
+                old_value=old[1],
+                new_value=card["description_hash"],
+                event_metadata=None,
+            )
+            for card, old in changed
+            if card["description_hash"] and old[1] and card["description_hash"] != old[1]
+        ]
+
+        # === CONTENT_MAIN_PHOTO_CHANGED ===
+        # Most important for CTR! Uses photo_id (not full URL)
+        main_changed = [
+            (card, old)
+            for card, old in changed
+            if card["main_photo_id"] and old[2] and card["main_photo_id"] != old[2]
+        ]
+        main_events = [
+            EventRecord(
+                shop_id=shop_id,
+                advert_id=0,
+                nm_id=card["nm_id"],
+                event_type=EVENT_CONTENT_MAIN_PHOTO_CHANGED,
+                old_value=old[2],
+                new_value=card["main_photo_id"],
+                event_metadata={
+                    "old_count": old[4],
+                    "new_count": card["photos_count"],
+                },
+            )
+            for card, old in main_changed
+        ]
+
+        # === CONTENT_PHOTO_ORDER_CHANGED ===
+        # Detects added/removed/reordered secondary photos (affects CR)
+        # Only fires if main photo is unchanged (otherwise MAIN_PHOTO_CHANGED covers it)
+        main_changed_ids = {card["nm_id"] for card, _ in main_changed}
+        photo_events = [
+            EventRecord(
+                shop_id=shop_id,
+                advert_id=0,
+                nm_id=card["nm_id"],
+                event_type=EVENT_CONTENT_PHOTO_ORDER_CHANGED,
+                old_value=old[3],
+                new_value=card["photos_hash"],
+                event_metadata={
+                    "old_count": old[4],
+                    "new_count": card["photos_count"],
+                },
+            )
+            for card, old in changed
+            if card["nm_id"] not in main_changed_ids
+            and card["photos_hash"] and old[3] and card["photos_hash"] != old[3]
+        ]
+
+        events = title_events + desc_events + main_events + photo_events
 
         logger.info(
-            f"Content audit: {len(events)} events detected "
-            f"({len(cards_data)} products checked)"
+            "Content audit: %d events detected (%d products checked, %d new skipped): "
+            "title=%d desc=%d main_photo=%d photo_order=%d",
+            len(events), len(cards_data), new_products,
+            len(title_events), len(desc_events), len(main_events), len(photo_events),
         )
         return events
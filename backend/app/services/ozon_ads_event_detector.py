@@ -16,15 +16,31 @@ Event types:
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, Iterator, List, Optional, Set
 
 from app.core.redis_state import RedisStateManager
+from app.models.event_log import EventRecord
 
 logger = logging.getLogger(__name__)
 
 # Bid values from API are in microroubles
 MICROROUBLES = 1_000_000
 
+# Event types (shared module-level objects, not rebuilt per event)
+EVENT_OZON_BID_CHANGE = "OZON_BID_CHANGE"
+EVENT_OZON_STATUS_CHANGE = "OZON_STATUS_CHANGE"
+EVENT_OZON_BUDGET_CHANGE = "OZON_BUDGET_CHANGE"
+EVENT_OZON_ITEM_ADD = "OZON_ITEM_ADD"
+EVENT_OZON_ITEM_REMOVE = "OZON_ITEM_REMOVE"
+
+
+def _campaign_id(camp: Dict[str, Any]) -> int:
+    """Campaign id from the API dict, 0 if missing or malformed."""
+    try:
+        return int(camp.get("id", 0))
+    except (ValueError, TypeError):
+        return 0
+
 
 class OzonAdsEventDetector:
     """
@@ -45,7 +61,7 @@ class OzonAdsEventDetector:
         shop_id: int,
         campaigns: List[Dict[str, Any]],
         products_by_campaign: Dict[int, List[Dict[str, Any]]],
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EventRecord]:
         """
         Full detection pipeline.
 
@@ -55,38 +71,82 @@ class OzonAdsEventDetector:
             products_by_campaign: {campaign_id: [products from /v2/products]}
 
         Returns:
-            List of event dicts ready for event_log insertion.
+            List of EventRecord ready for event_log insertion.
         """
-        events = []
+        return list(self.iter_events(shop_id, campaigns, products_by_campaign))
+
+    def iter_events(
+        self,
+        shop_id: int,
+        campaigns: List[Dict[str, Any]],
+        products_by_campaign: Dict[int, List[Dict[str, Any]]],
+    ) -> Iterator[EventRecord]:
+        """
+        Streaming variant of detect_all: yields events campaign by campaign,
+        so the caller can insert them in batches without holding them all.
+
+        Redis state is written once the iterator is exhausted; a consumer
+        that stops early (e.g. failed INSERT) leaves the old state in place
+        and the same changes are detected again on the next run.
+        """
+        # Read every campaign state in one round-trip, write back in one
+        campaign_ids = {_campaign_id(camp) for camp in campaigns}
+        campaign_ids.update(products_by_campaign)
+        campaign_ids.discard(0)
+        old_states = self.state_manager.get_ozon_campaign_states_bulk(
+            shop_id, campaign_ids
+        )
+        pending: Dict[int, Dict[str, Any]] = {}
+        detected = 0
 
         # 1. Campaign-level: STATUS_CHANGE + BUDGET_CHANGE
-        events.extend(self.detect_campaign_changes(shop_id, campaigns))
+        events = self.detect_campaign_changes(shop_id, campaigns, old_states, pending)
+        detected += len(events)
+        yield from events
 
         # 2. Product-level: BID_CHANGE + ITEM_ADD/REMOVE
         for campaign_id, products in products_by_campaign.items():
-            events.extend(
-                self.detect_product_changes(shop_id, campaign_id, products)
+            events = self.detect_product_changes(
+                shop_id, campaign_id, products, old_states, pending
             )
+            detected += len(events)
+            yield from events
 
-        logger.info("Ozon EventDetector: %d events detected", len(events))
-        return events
+        self.state_manager.set_ozon_campaign_states_bulk(shop_id, pending)
+
+        logger.info("Ozon EventDetector: %d events detected", detected)
 
     def detect_campaign_changes(
         self,
         shop_id: int,
         campaigns: List[Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
+        old_states: Optional[Dict[int, Dict[str, Any]]] = None,
+        pending: Optional[Dict[int, Dict[str, Any]]] = None,
+    ) -> List[EventRecord]:
         """
         Detect STATUS_CHANGE and BUDGET_CHANGE from campaign list.
 
         Campaign dict from API:
             {id, title, state, advObjectType, dailyBudget, ...}
+
+        old_states/pending are shared by detect_all: states prefetched with
+        get_ozon_campaign_states_bulk and updates collected for one bulk
+        write. When omitted, Redis is read and written here.
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
+
+        flush = pending is None
+        if pending is None:
+            pending = {}
+        if old_states is None:
+            old_states = self.state_manager.get_ozon_campaign_states_bulk(
+                shop_id, {_campaign_id(camp) for camp in campaigns} - {0}
+            )
 
         for camp in campaigns:
             try:
-                campaign_id = int(camp.get("id", 0))
+                campaign_id = _campaign_id(camp)
                 if not campaign_id:
                     continue
 
@@ -100,55 +160,53 @@ class OzonAdsEventDetector:
                     except (ValueError, TypeError):
                         current_budget = None
 
-                # Get last state from Redis
-                old_state = self.state_manager.get_ozon_campaign_state(
-                    shop_id, campaign_id
-                )
+                old_state = old_states[campaign_id]
                 old_status = old_state.get("status")
                 old_budget = old_state.get("budget")
 
                 # ── STATUS_CHANGE ──
                 if current_status is not None and old_status is not None:
                     if str(current_status) != str(old_status):
-                        events.append({
-                            "shop_id": shop_id,
-                            "advert_id": campaign_id,
-                            "nm_id": None,
-                            "event_type": "OZON_STATUS_CHANGE",
-                            "old_value": str(old_status),
-                            "new_value": str(current_status),
-                            "event_metadata": {
+                        events.append(EventRecord(
+                            shop_id=shop_id,
+                            advert_id=campaign_id,
+                            nm_id=None,
+                            event_type=EVENT_OZON_STATUS_CHANGE,
+                            old_value=str(old_status),
+                            new_value=str(current_status),
+                            event_metadata={
                                 "title": camp.get("title", ""),
                                 "type": camp.get("advObjectType", ""),
                             },
-                        })
-                        logger.info(
-                            "OZON_STATUS_CHANGE: campaign=%d %s → %s",
-                            campaign_id, old_status, current_status,
-                        )
+                        ))
+                        if log_events:
+                            logger.info(
+                                "OZON_STATUS_CHANGE: campaign=%d %s → %s",
+                                campaign_id, old_status, current_status,
+                            )
 
                 # ── BUDGET_CHANGE ──
                 if current_budget is not None and old_budget is not None:
                     if abs(current_budget - old_budget) > 0.01:
-                        events.append({
-                            "shop_id": shop_id,
-                            "advert_id": campaign_id,
-                            "nm_id": None,
-                            "event_type": "OZON_BUDGET_CHANGE",
-                            "old_value": str(old_budget),
-                            "new_value": str(current_budget),
-                            "event_metadata": {
+                        events.append(EventRecord(
+                            shop_id=shop_id,
+                            advert_id=campaign_id,
+                            nm_id=None,
+                            event_type=EVENT_OZON_BUDGET_CHANGE,
+                            old_value=str(old_budget),
+                            new_value=str(current_budget),
+                            event_metadata={
                                 "title": camp.get("title", ""),
                             },
-                        })
-                        logger.info(
-                            "OZON_BUDGET_CHANGE: campaign=%d %.2f → %.2f",
-                            campaign_id, old_budget, current_budget,
-                        )
-
-                # Update campaign-level state in Redis
-                self.state_manager.set_ozon_campaign_state(
-                    shop_id, campaign_id,
+                        ))
+                        if log_events:
+                            logger.info(
+                                "OZON_BUDGET_CHANGE: campaign=%d %.2f → %.2f",
+                                campaign_id, old_budget, current_budget,
+                            )
+
+                # Campaign-level state, flushed to Redis in bulk
+                pending.setdefault(campaign_id, {}).update(
                     status=str(current_status) if current_status else None,
                     budget=current_budget,
                 )
@@ -160,6 +218,9 @@ class OzonAdsEventDetector:
                 )
                 continue
 
+        if flush:
+            self.state_manager.set_ozon_campaign_states_bulk(shop_id, pending)
+
         return events
 
     def detect_product_changes(
@@ -167,99 +228,115 @@ class OzonAdsEventDetector:
         shop_id: int,
         campaign_id: int,
         products: List[Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
+        old_states: Optional[Dict[int, Dict[str, Any]]] = None,
+        pending: Optional[Dict[int, Dict[str, Any]]] = None,
+    ) -> List[EventRecord]:
         """
         Detect BID_CHANGE, ITEM_ADD, ITEM_REMOVE for a campaign's products.
 
-        Product dict from API (/v2/products):
+        Product dict from OzonAdsService.get_campaign_products():
             {sku, bid, title, ...}
-            bid is in microroubles.
+            sku and bid are int, bid is in microroubles.
+
+        old_states/pending: see detect_campaign_changes.
         """
         events = []
+        log_events = logger.isEnabledFor(logging.INFO)
 
         # Get last state
-        old_state = self.state_manager.get_ozon_campaign_state(
-            shop_id, campaign_id
-        )
-        old_bids = old_state.get("bids", {})  # {str(sku): bid_rub}
-        old_items = set(int(x) for x in old_state.get("items", []))
-
-        # Build current state
-        current_bids = {}
-        current_items = set()
-
-        for p in products:
-            sku = int(p.get("sku", 0))
-            if not sku:
-                continue
-
-            current_items.add(sku)
-
-            # Convert bid from microroubles to roubles
-            raw_bid = p.get("bid", 0)
-            try:
-                bid_rub = int(raw_bid) / MICROROUBLES
-            except (ValueError, TypeError):
-                bid_rub = 0.0
-
-            current_bids[str(sku)] = bid_rub
-
-            # ── BID_CHANGE ──
-            old_bid = old_bids.get(str(sku))
-            if old_bid is not None and abs(old_bid - bid_rub) > 0.01:
-                events.append({
-                    "shop_id": shop_id,
-                    "advert_id": campaign_id,
-                    "nm_id": sku,
-                    "event_type": "OZON_BID_CHANGE",
-                    "old_value": str(old_bid),
-                    "new_value": str(bid_rub),
-                    "event_metadata": {
-                        "title": p.get("title", ""),
+        if old_states is not None:
+            old_state = old_states[campaign_id]
+        else:
+            old_state = self.state_manager.get_ozon_campaign_state(
+                shop_id, campaign_id
+            )
+        old_bids = old_state.get("bids", {})  # {sku: bid_rub}
+        old_items = frozenset(old_state.get("items", []))
+
+        # Build current state (sku/bid already int, see get_campaign_products)
+        current_bids = {p["sku"]: p["bid"] / MICROROUBLES for p in products}
+        titles = {p["sku"]: p.get("title", "") for p in products}
+
+        # ── BID_CHANGE ──
+        # Bids rarely move between polls: an equal bid map skips the per-SKU
+        # compare, otherwise only the changed SKUs are turned into events
+        if current_bids != old_bids:
+            changed = [
+                (sku, old_bids[sku], bid_rub)
+                for sku, bid_rub in current_bids.items()
+                if sku in old_bids and abs(old_bids[sku] - bid_rub) > 0.01
+            ]
+            events.extend([
+                EventRecord(
+                    shop_id=shop_id,
+                    advert_id=campaign_id,
+                    nm_id=sku,
+                    event_type=EVENT_OZON_BID_CHANGE,
+                    old_value=str(old_bid),
+                    new_value=str(bid_rub),
+                    event_metadata={
+                        "title": titles[sku],
                     },
-                })
-                logger.info(
-                    "OZON_BID_CHANGE: campaign=%d sku=%d %.2f → %.2f",
-                    campaign_id, sku, old_bid, bid_rub,
                 )
+                for sku, old_bid, bid_rub in changed
+            ])
+            if log_events:
+                for sku, old_bid, bid_rub in changed:
+                    logger.info(
+                        "OZON_BID_CHANGE: campaign=%d sku=%d %.2f → %.2f",
+                        campaign_id, sku, old_bid, bid_rub,
+                    )
+
+        # Current SKUs are the bid dict keys (a set-like view, no extra set)
+        current_items = current_bids.keys()
+        added = current_items - old_items
+        removed = old_items - current_items
 
         # ── ITEM_ADD ──
-        added = current_items - old_items
-        for sku in added:
-            events.append({
-                "shop_id": shop_id,
-                "advert_id": campaign_id,
-                "nm_id": sku,
-                "event_type": "OZON_ITEM_ADD",
-                "old_value": None,
-                "new_value": str(sku),
-                "event_metadata": None,
-            })
-            logger.info(
-                "OZON_ITEM_ADD: campaign=%d sku=%d", campaign_id, sku,
+        events.extend([
+            EventRecord(
+                shop_id=shop_id,
+                advert_id=campaign_id,
+                nm_id=sku,
+                event_type=EVENT_OZON_ITEM_ADD,
+                old_value=None,
+                new_value=str(sku),
+                event_metadata=None,
             )
+            for sku in added
+        ])
 
         # ── ITEM_REMOVE ──
-        removed = old_items - current_items
-        for sku in removed:
-            events.append({
-                "shop_id": shop_id,
-                "advert_id": campaign_id,
-                "nm_id": sku,
-                "event_type": "OZON_ITEM_REMOVE",
-                "old_value": str(sku),
-                "new_value": None,
-                "event_metadata": None,
-            })
-            logger.info(
-                "OZON_ITEM_REMOVE: campaign=%d sku=%d", campaign_id, sku,
+        events.extend([
+            EventRecord(
+                shop_id=shop_id,
+                advert_id=campaign_id,
+                nm_id=sku,
+                event_type=EVENT_OZON_ITEM_REMOVE,
+                old_value=str(sku),
+                new_value=None,
+                event_metadata=None,
+            )
+            for sku in removed
+        ])
+
+        if log_events:
+            for sku in added:
+                logger.info("OZON_ITEM_ADD: campaign=%d sku=%d", campaign_id, sku)
+            for sku in removed:
+                logger.info("OZON_ITEM_REMOVE: campaign=%d sku=%d", campaign_id, sku)
+
+        # Update product-level state in Redis (or queue it for detect_all)
+        if pending is not None:
+            pending.setdefault(campaign_id, {}).update(
+                bids=current_bids,
+                items=list(current_items),
+            )
+        else:
+            self.state_manager.set_ozon_campaign_state(
+                shop_id, campaign_id,
+                bids=current_bids,
+                items=list(current_items),
             )
-
-        # Update product-level state in Redis
-        self.state_manager.set_ozon_campaign_state(
-            shop_id, campaign_id,
-            bids=current_bids,
-            items=list(current_items),
-        )
 
         return events
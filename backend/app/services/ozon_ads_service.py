@@ -27,13 +27,16 @@ import csv
 import io
 import logging
 import os
+import random
 import re
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import httpx
+import orjson
 import clickhouse_connect
 from clickhouse_connect.driver.client import Client as ClickHouseClient
 
@@ -52,21 +55,83 @@ CH_BIDS_TABLE = "mms_analytics.log_ozon_bids"
 CH_STATS_TABLE = "mms_analytics.fact_ozon_ad_daily"
 
 # Report poll settings
-REPORT_POLL_INTERVAL = 10   # seconds between status checks (reduced API load)
+REPORT_POLL_INTERVAL = 2    # first status check delay, seconds
+REPORT_POLL_BACKOFF = 1.5   # delay multiplier per check
+REPORT_POLL_MAX_INTERVAL = 30  # cap on delay between status checks
 REPORT_POLL_MAX_WAIT = 300  # max seconds to wait for report (Ozon generates slowly)
 
 # Retry settings for 429 / transient errors
 RETRY_MAX_ATTEMPTS = 3     # max retries per batch
-RETRY_PAUSE_SECONDS = 60   # pause between retries
-BATCH_PAUSE_SECONDS = 30   # pause between successful batches (Ozon: 1 concurrent download/account)
-
+RETRY_PAUSE_SECONDS = 15   # first pause between retries, doubles per attempt (±20% jitter)
+RETRY_PAUSE_MAX = 120      # cap on pause between retries
+BATCH_PAUSE_SECONDS = 30   # min gap between report orders (Ozon: 1 concurrent download/account)
+REPORTS_IN_FLIGHT = 3      # batches ordered/polled concurrently
+
+# Concurrent /v2/products fetch workers (each holds its own DB session + client)
+BIDS_FETCH_CONCURRENCY = 8
+
+# Campaign list cache (Redis)
+CAMPAIGNS_CACHE_KEY = "mms:ozon:campaigns:{shop_id}:{state}:{adv_object_type}"
+CAMPAIGNS_CACHE_TTL = 300  # seconds
+
+# CSV report parsing
+_CAMPAIGN_RE = re.compile(r"№\s*(\d+)")
+_DATE_RE = re.compile(r"^\d{2}\.\d{2}\.\d{4}$")
+
+# Report columns located by the "День;..." header row, in OzonStatRow order
+# (sku, views … model_revenue), with positional fallbacks for a CSV whose
+# header row is missing. drr is optional: short rows get 0.0.
+_STAT_COLUMNS = (
+    ("sku", 1),
+    ("Показы", 4),
+    ("Клики", 5),
+    ("CTR%", 6),
+    ("В корзину", 7),
+    ("Ср.стоимость клика₽", 8),
+    ("Расход₽", 9),
+    ("Заказы", 10),
+    ("Продажи₽", 11),
+    ("Заказы модели", 12),
+    ("Продажи модели₽", 13),
+)
+_DRR_COLUMN = ("ДРР%", 14)
+
+
+def _stat_column_index(header: Optional[List[str]] = None) -> Tuple[List[int], int]:
+    """Column positions for _STAT_COLUMNS and drr from a header row (or the defaults)."""
+    positions: Dict[str, int] = {}
+    for i, name in enumerate(header or ()):
+        positions.setdefault(name.strip().lstrip("\ufeff"), i)
+    columns = [positions.get(name, default) for name, default in _STAT_COLUMNS]
+    return columns, positions.get(*_DRR_COLUMN)
+
+
+class OzonStatRow(NamedTuple):
+    """
+    One parsed row of an Ozon Performance statistics report.
 
-def _bid_to_rub(bid_micro: str) -> float:
-    """Convert microroubles bid to roubles."""
-    try:
-        return int(bid_micro) / MICROROUBLES
-    except (ValueError, TypeError):
-        return 0.0
+    Tuple-based (no per-row dict): field order matches the fact_ozon_ad_daily
+    columns minus updated_at, so the ClickHouse row is (dt, now, *row[1:]).
+    """
+    dt: date
+    shop_id: int
+    campaign_id: int
+    sku: int
+    views: int
+    clicks: int
+    ctr: float
+    add_to_cart: int
+    avg_cpc: float
+    money_spent: float
+    orders: int
+    revenue: float
+    model_orders: int
+    model_revenue: float
+    drr: float
+
+
+# Dedup key of OzonStatRow: (shop_id, campaign_id, sku, dt)
+_stat_row_key = itemgetter(1, 2, 3, 0)
 
 
 def _safe_float(val) -> float:
@@ -89,6 +154,22 @@ def _safe_int(val) -> int:
         return 0
 
 
+def _csv_int(cell: str) -> int:
+    """_safe_int for csv.reader cells: clean integers skip the str cleanup."""
+    try:
+        return int(cell)
+    except ValueError:
+        return _safe_int(cell)
+
+
+def _csv_float(cell: str) -> float:
+    """_safe_float for csv.reader cells: decimal comma fixed up front, rest on fallback."""
+    try:
+        return float(cell.replace(",", "."))
+    except ValueError:
+        return _safe_float(cell)
+
+
 # ── Ozon Ads Service ──────────────────────────────────────
 class OzonAdsService:
     """
@@ -122,6 +203,42 @@ class OzonAdsService:
             client_secret=perf_client_secret,
             redis_client=redis_client,
         )
+        # Shared clients, opened lazily and closed by aclose():
+        # MarketplaceClient for _request, raw httpx for report polling/download
+        self._client: Optional[MarketplaceClient] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the shared clients (MarketplaceClient also clears its sticky proxy)."""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.__aexit__(None, None, None)
+        if self._http is not None:
+            http, self._http = self._http, None
+            await http.aclose()
+
+    def _http_client(self) -> httpx.AsyncClient:
+        """Pooled keep-alive httpx client for report polling and downloads."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=30,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._http
+
+    def _new_client(self, db: AsyncSession) -> MarketplaceClient:
+        return MarketplaceClient(
+            db=db,
+            shop_id=self.shop_id,
+            marketplace="ozon_performance",
+            max_retries=1,  # No retry inside client — 429 handled in fetch_statistics()
+        )
 
     async def _reset_rate_limiter_backoff(self):
         """Reset internal rate limiter backoff to break the vicious cycle.
@@ -148,6 +265,7 @@ class OzonAdsService:
         json: dict = None,
         params: dict = None,
         timeout: int = 20,
+        client: Optional[MarketplaceClient] = None,
     ):
         """
         Make authenticated request via MarketplaceClient (proxy + rate limit).
@@ -155,25 +273,26 @@ class OzonAdsService:
         OAuth2 Bearer token is passed via headers kwarg, which
         MarketplaceClient._make_request pops and merges into final headers.
 
+        The client bound to self.db is created on first use and reused
+        until aclose() (one proxy lookup + circuit breaker check per service,
+        not per call). Concurrent callers pass their own client (opened on
+        their own AsyncSession — a session must not be shared between tasks
+        running at the same time).
+
         Returns MarketplaceResponse with .status_code, .data, .is_success, .error.
         """
         token = await self.auth.get_token()
         bearer_headers = {"Authorization": f"Bearer {token}"}
+        request_kwargs = dict(json=json, params=params, headers=bearer_headers)
 
-        async with MarketplaceClient(
-            db=self.db,
-            shop_id=self.shop_id,
-            marketplace="ozon_performance",
-            max_retries=1,  # No retry inside client — 429 handled in fetch_statistics()
-        ) as client:
-            response = await client.request(
-                method,
-                path,
-                json=json,
-                params=params,
-                headers=bearer_headers,
-            )
+        if client is None:
+            if self._client is None:
+                self._client = await self._new_client(self.db).__aenter__()
+            client = self._client
+        response = await client.request(method, path, **request_kwargs)
 
+        if method != "GET" and path.startswith("/api/client/campaign"):
+            await self._invalidate_campaigns_cache()
         return response
 
     # ── Campaigns ──────────────────────────────────────────
@@ -190,8 +309,22 @@ class OzonAdsService:
             state: Filter by state (CAMPAIGN_STATE_RUNNING, CAMPAIGN_STATE_INACTIVE, etc.)
             adv_object_type: Filter by type (SKU, BANNER, SEARCH_PROMO)
 
+        Cached in Redis for CAMPAIGNS_CACHE_TTL per (state, adv_object_type);
+        any write to /api/client/campaign* through _request drops the cache.
+
         Returns list of campaign dicts with id, title, state, advObjectType, dailyBudget.
         """
+        cache_key = CAMPAIGNS_CACHE_KEY.format(
+            shop_id=self.shop_id, state=state, adv_object_type=adv_object_type,
+        )
+        if self.redis_client:
+            try:
+                cached = await self.redis_client.get(cache_key)
+                if cached:
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning("Ozon campaigns cache read error: %s", e)
+
         params = {}
         if state:
             params["state"] = state
@@ -210,13 +343,36 @@ class OzonAdsService:
         data = response.data if isinstance(response.data, dict) else {}
         campaigns = data.get("list", [])
         logger.info("Ozon: found %d campaigns", len(campaigns))
+
+        if self.redis_client:
+            try:
+                await self.redis_client.set(
+                    cache_key, orjson.dumps(campaigns), ex=CAMPAIGNS_CACHE_TTL,
+                )
+            except Exception as e:
+                logger.warning("Ozon campaigns cache write error: %s", e)
         return campaigns
 
+    async def _invalidate_campaigns_cache(self):
+        """Drop every cached campaign list of this shop."""
+        if not self.redis_client:
+            return
+        pattern = CAMPAIGNS_CACHE_KEY.format(
+            shop_id=self.shop_id, state="*", adv_object_type="*",
+        )
+        try:
+            keys = [key async for key in self.redis_client.scan_iter(match=pattern)]
+            if keys:
+                await self.redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning("Ozon campaigns cache invalidation error: %s", e)
+
     # ── Bids (Real-Time) ───────────────────────────────────
 
     async def get_campaign_products(
         self,
         campaign_id: int,
+        client: Optional[MarketplaceClient] = None,
     ) -> List[dict]:
         """
         Get products with their current bids.
@@ -224,11 +380,14 @@ class OzonAdsService:
         GET /api/client/campaign/{id}/v2/products
 
         Returns: [{sku, bid, title}, ...]
+        sku and bid are coerced to int once here (the API sends strings),
+        products without a valid SKU are dropped, an unparsable bid becomes 0.
         bid is in microroubles (14000000 = 14 RUB).
         """
         response = await self._request(
             "GET",
             f"/api/client/campaign/{campaign_id}/v2/products",
+            client=client,
         )
 
         if not response.is_success:
@@ -239,7 +398,19 @@ class OzonAdsService:
             return []
 
         data = response.data if isinstance(response.data, dict) else {}
-        products = data.get("products", [])
+        products = []
+        for p in data.get("products", []):
+            try:
+                sku = int(p.get("sku", 0))
+            except (ValueError, TypeError):
+                sku = 0
+            if not sku:
+                continue
+            try:
+                bid = int(p.get("bid", 0))
+            except (ValueError, TypeError):
+                bid = 0
+            products.append({**p, "sku": sku, "bid": bid})
         logger.debug(
             "Campaign %d: %d products", campaign_id, len(products),
         )
@@ -274,6 +445,51 @@ class OzonAdsService:
         data = response.data if isinstance(response.data, dict) else {}
         return data.get("bids", [])
 
+    async def get_products_by_campaign(
+        self,
+        campaign_ids: List[int],
+    ) -> Dict[int, List[dict]]:
+        """
+        Fetch /v2/products for many campaigns concurrently.
+
+        Campaign IDs are queued and drained by up to BIDS_FETCH_CONCURRENCY
+        workers; request pacing is still enforced by MarketplaceClient's rate
+        limiter. Each worker owns one AsyncSession (proxy/request logs) and
+        one MarketplaceClient for all campaigns it fetches. A failed campaign
+        is logged and left out of the result.
+
+        Returns: {campaign_id: [{sku, bid, title}, ...]} in input order.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for campaign_id in campaign_ids:
+            queue.put_nowait(campaign_id)
+        fetched: Dict[int, List[dict]] = {}
+
+        async def worker():
+            async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+                async with self._new_client(db) as client:
+                    while not queue.empty():
+                        campaign_id = queue.get_nowait()
+                        try:
+                            fetched[campaign_id] = await self.get_campaign_products(
+                                campaign_id, client=client,
+                            )
+                        except Exception as e:
+                            logger.warning(
+                                "Ozon products fetch failed for campaign %d: %s",
+                                campaign_id, e,
+                            )
+                await db.commit()
+
+        workers = min(BIDS_FETCH_CONCURRENCY, len(campaign_ids))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        return {
+            campaign_id: fetched[campaign_id]
+            for campaign_id in campaign_ids
+            if campaign_id in fetched
+        }
+
     async def get_all_bids(self) -> List[dict]:
         """
         Get current bids for ALL running campaigns.
@@ -281,24 +497,20 @@ class OzonAdsService:
         Returns list of {campaign_id, sku, bid_rub, bid_micro, title}
         """
         campaigns = await self.get_campaigns(state="CAMPAIGN_STATE_RUNNING")
-        all_bids = []
+        campaign_ids = [int(c["id"]) for c in campaigns if c.get("id")]
+        products_by_campaign = await self.get_products_by_campaign(campaign_ids)
 
-        for camp in campaigns:
-            campaign_id = camp.get("id")
-            if not campaign_id:
-                continue
-
-            products = await self.get_campaign_products(campaign_id)
-            for p in products:
-                all_bids.append({
-                    "campaign_id": int(campaign_id),
-                    "sku": int(p.get("sku", 0)),
-                    "bid_micro": int(p.get("bid", 0)),
-                    "bid_rub": _bid_to_rub(p.get("bid", "0")),
-                    "title": p.get("title", ""),
-                })
-
-            await asyncio.sleep(0.3)  # rate limit safety
+        all_bids = [
+            {
+                "campaign_id": campaign_id,
+                "sku": p["sku"],
+                "bid_micro": p["bid"],
+                "bid_rub": p["bid"] / MICROROUBLES,
+                "title": p.get("title", ""),
+            }
+            for campaign_id, products in products_by_campaign.items()
+            for p in products
+        ]
 
         logger.info("Fetched bids for %d products across %d campaigns",
                      len(all_bids), len(campaigns))
@@ -358,31 +570,44 @@ class OzonAdsService:
         GET /api/client/statistics/{UUID}
 
         Uses raw httpx (not MarketplaceClient) to avoid rate limiter overhead
-        during polling. Polling is lightweight GET, doesn't need proxy/JA3.
+        during polling. Polling is lightweight GET, doesn't need proxy/JA3;
+        the shared keep-alive client avoids a TLS handshake per poll.
+        Checks back off exponentially (with jitter) up to REPORT_POLL_MAX_INTERVAL.
 
         Returns download link when state=OK, None on timeout/error.
         """
         start = time.time()
         token = await self.auth.get_token()
         url = f"https://api-performance.ozon.ru/api/client/statistics/{uuid}"
+        attempt = 0
+
+        async def pause():
+            # Exponential backoff with ±20% jitter: ~2s, 3s, 4.5s, ... capped
+            nonlocal attempt
+            delay = min(
+                REPORT_POLL_MAX_INTERVAL,
+                REPORT_POLL_INTERVAL * REPORT_POLL_BACKOFF ** attempt,
+            )
+            attempt += 1
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
 
         while time.time() - start < REPORT_POLL_MAX_WAIT:
             try:
-                async with httpx.AsyncClient(timeout=20) as client:
-                    resp = await client.get(
-                        url,
-                        headers={"Authorization": f"Bearer {token}"},
-                    )
+                resp = await self._http_client().get(
+                    url,
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=20,
+                )
 
                 if resp.status_code != 200:
                     logger.warning("Ozon report status error: %s", resp.status_code)
                     # Refresh token on 401
                     if resp.status_code == 401:
                         token = await self.auth.get_token()
-                    await asyncio.sleep(REPORT_POLL_INTERVAL)
+                    await pause()
                     continue
 
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 state = data.get("state")
 
                 if state == "OK":
@@ -398,14 +623,16 @@ class OzonAdsService:
             except Exception as e:
                 logger.warning("Ozon report poll error: %s", e)
 
-            await asyncio.sleep(REPORT_POLL_INTERVAL)
+            await pause()
 
         logger.error("Ozon report timeout: UUID=%s (waited %ds)", uuid, REPORT_POLL_MAX_WAIT)
         return None
 
-    async def download_report(self, link: str) -> str:
+    async def fetch_and_parse_report(
+        self, link: str, shop_id: int,
+    ) -> Optional[List[OzonStatRow]]:
         """
-        Download report CSV content.
+        Download a report and parse it into rows for ClickHouse.
 
         GET /api/client/statistics/report?UUID=...
 
@@ -413,52 +640,63 @@ class OzonAdsService:
         - Plain CSV for single-campaign reports
         - ZIP archive with multiple CSVs for batch reports (10+ campaigns)
 
-        We detect the format and handle both cases.
-        Returns concatenated CSV string.
+        Each CSV (ZIP member or plain body) is decoded as a stream and fed
+        straight into csv.reader — no intermediate decoded/joined string.
+        Returns None if the download failed.
         """
         import zipfile
-        import io
 
         # Use httpx directly (not MarketplaceClient) because we need raw bytes
         # for ZIP detection. MarketplaceClient tries to json-parse everything.
         token = await self.auth.get_token()
         url = f"https://api-performance.ozon.ru{link}"
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(
-                url,
-                headers={"Authorization": f"Bearer {token}", "Accept": "*/*"},
-            )
+        response = await self._http_client().get(
+            url,
+            headers={"Authorization": f"Bearer {token}", "Accept": "*/*"},
+        )
 
         if response.status_code != 200:
             logger.error(
                 "Ozon report download error: status=%s body=%s",
                 response.status_code, response.text[:200],
             )
-            return ""
+            return None
 
         raw_bytes = response.content
+        if not raw_bytes:
+            return None
+
+        rows = []
 
         # Detect ZIP (starts with PK\x03\x04)
         if raw_bytes[:4] == b'PK\x03\x04':
-            logger.info("Report is ZIP archive (%d bytes), extracting CSVs...", len(raw_bytes))
-            csv_parts = []
+            logger.info("Report is ZIP archive (%d bytes), parsing CSVs...", len(raw_bytes))
+            csv_count = 0
             with zipfile.ZipFile(io.BytesIO(raw_bytes)) as zf:
                 for name in zf.namelist():
-                    if name.endswith('.csv'):
-                        csv_content = zf.read(name).decode('utf-8-sig')
-                        csv_parts.append(csv_content)
-                        logger.debug("Extracted %s (%d chars)", name, len(csv_content))
-            logger.info("Extracted %d CSV files from ZIP", len(csv_parts))
-            return "\n".join(csv_parts)
+                    if not name.endswith('.csv'):
+                        continue
+                    with zf.open(name) as fh:
+                        text = io.TextIOWrapper(fh, encoding='utf-8-sig', newline='')
+                        rows.extend(
+                            self.parse_csv_rows(csv.reader(text, delimiter=";"), shop_id)
+                        )
+                    csv_count += 1
+            logger.info("Parsed %d CSV files from ZIP", csv_count)
+        else:
+            # Plain CSV (single campaign)
+            text = io.TextIOWrapper(io.BytesIO(raw_bytes), encoding='utf-8-sig', newline='')
+            rows = self.parse_csv_rows(csv.reader(text, delimiter=";"), shop_id)
 
-        # Plain CSV (single campaign)
-        return raw_bytes.decode('utf-8-sig')
+        logger.info("Parsed %d rows from Ozon CSV (%d campaigns)", len(rows),
+                     len(set(r.campaign_id for r in rows)))
+        return rows
 
     @staticmethod
-    def parse_csv_report(csv_text: str, shop_id: int) -> List[dict]:
+    def parse_csv_rows(reader: Iterable[List[str]], shop_id: int) -> List[OzonStatRow]:
         """
-        Parse Ozon Performance CSV report into structured dicts.
+        Parse one Ozon Performance CSV report (as csv.reader rows) into OzonStatRow.
 
         CSV format (semicolon-separated, BOM-prefixed):
             \ufeff;Кампания по продвижению товаров № XXXXX, период ...
@@ -468,75 +706,81 @@ class OzonAdsService:
             dd.mm.yyyy;SKU;...
             Всего;...
 
-        For multi-campaign ZIP reports, multiple CSVs are concatenated.
-        Each CSV starts with its own header containing "№ XXXXX".
+        The header row containing "№ XXXXX" sets campaign_id for the rows below it;
+        the "День;..." row maps columns by name (see _STAT_COLUMNS).
 
-        Returns list of dicts ready for ClickHouse insert.
+        Returns list of OzonStatRow ready for ClickHouse insert.
         """
         rows = []
 
-        # Strip BOM and whitespace
-        csv_text = csv_text.strip().lstrip("\ufeff")
-        lines = csv_text.split("\n")
-
-        if not lines:
-            return rows
-
         # campaign_id is updated dynamically as we encounter new headers
         campaign_id = 0
-
-        # Parse data lines
-        for line in lines:
-            line = line.strip().lstrip("\ufeff")
-            if not line:
-                continue
-
-            # Update campaign_id when we encounter a new campaign header
-            if "Кампания" in line and "№" in line:
-                match = re.search(r"№\s*(\d+)", line)
-                if match:
-                    campaign_id = int(match.group(1))
+        # A report spans a few dozen distinct days — strptime each only once
+        # (keyed by the raw first cell)
+        dates: Dict[str, date] = {}
+        columns, drr_idx = _stat_column_index()
+        pick = itemgetter(*columns)
+        min_len = max(columns) + 1
+
+        for parts in reader:
+            if not parts:
                 continue
 
-            # Skip non-data rows
-            if line.startswith("День;") or line.startswith("Всего"):
-                continue
+            # Fast path: data rows start with a date seen before in this report
+            # (keyed by the raw cell, so no strip/regex for them)
+            cell = parts[0]
+            dt = dates.get(cell)
+            if dt is None:
+                date_str = cell.strip().lstrip("\ufeff")
+
+                # Non-data rows: campaign header ("Кампания ... № XXXXX"),
+                # column header ("День;...") and totals ("Всего;...")
+                if not _DATE_RE.match(date_str):
+                    if date_str == "День":
+                        columns, drr_idx = _stat_column_index(parts)
+                        pick = itemgetter(*columns)
+                        min_len = max(columns) + 1
+                        continue
+                    line = ";".join(parts)
+                    if "Кампания" in line:
+                        match = _CAMPAIGN_RE.search(line)
+                        if match:
+                            campaign_id = int(match.group(1))
+                    continue
 
-            parts = line.split(";")
-            if len(parts) < 14:
-                continue
+                # Parse date (dd.mm.yyyy)
+                try:
+                    dt = dates[cell] = datetime.strptime(date_str, "%d.%m.%Y").date()
+                except ValueError:
+                    continue
 
-            # Parse date (dd.mm.yyyy)
-            date_str = parts[0].strip()
-            try:
-                dt = datetime.strptime(date_str, "%d.%m.%Y").date()
-            except (ValueError, IndexError):
+            if len(parts) < min_len:
                 continue
 
-            sku = _safe_int(parts[1])
+            (sku, views, clicks, ctr, add_to_cart, avg_cpc, money_spent,
+             orders, revenue, model_orders, model_revenue) = pick(parts)
+            sku = _csv_int(sku)
             if not sku:
                 continue
 
-            rows.append({
-                "dt": dt,
-                "shop_id": shop_id,
-                "campaign_id": campaign_id,
-                "sku": sku,
-                "views": _safe_int(parts[4]),
-                "clicks": _safe_int(parts[5]),
-                "ctr": _safe_float(parts[6]),
-                "add_to_cart": _safe_int(parts[7]),
-                "avg_cpc": _safe_float(parts[8]),
-                "money_spent": _safe_float(parts[9]),
-                "orders": _safe_int(parts[10]),
-                "revenue": _safe_float(parts[11]),
-                "model_orders": _safe_int(parts[12]),
-                "model_revenue": _safe_float(parts[13]),
-                "drr": _safe_float(parts[14]) if len(parts) > 14 else 0.0,
-            })
+            rows.append(OzonStatRow(
+                dt,
+                shop_id,
+                campaign_id,
+                sku,
+                _csv_int(views),
+                _csv_int(clicks),
+                _csv_float(ctr),
+                _csv_int(add_to_cart),
+                _csv_float(avg_cpc),
+                _csv_float(money_spent),
+                _csv_int(orders),
+                _csv_float(revenue),
+                _csv_int(model_orders),
+                _csv_float(model_revenue),
+                _csv_float(parts[drr_idx]) if len(parts) > drr_idx else 0.0,
+            ))
 
-        logger.info("Parsed %d rows from Ozon CSV (%d campaigns)", len(rows),
-                     len(set(r["campaign_id"] for r in rows)) if rows else 0)
         return rows
 
     async def fetch_statistics(
@@ -546,15 +790,20 @@ class OzonAdsService:
         date_from: str,
         date_to: str,
         batch_size: int = 10,
-    ) -> List[dict]:
+    ) -> List[OzonStatRow]:
         """
         Full pipeline: order → wait → download → parse.
 
         Ozon API limit: max 10 campaigns per report.
         So we batch campaign_ids into groups of 10.
 
-        On 429 / transient errors, retries up to RETRY_MAX_ATTEMPTS times
-        with RETRY_PAUSE_SECONDS pause between attempts.
+        Batches are pipelined: up to REPORTS_IN_FLIGHT batches are ordered
+        and polled concurrently (orders at least BATCH_PAUSE_SECONDS apart),
+        while downloads stay serialized (1 concurrent download per account).
+
+        On 429 / transient errors in any stage, the batch restarts from the
+        order, up to RETRY_MAX_ATTEMPTS times, with an exponential pause
+        (RETRY_PAUSE_SECONDS doubling, capped at RETRY_PAUSE_MAX, jittered).
 
         Returns parsed rows ready for ClickHouse.
         """
@@ -571,88 +820,82 @@ class OzonAdsService:
             len(campaign_ids), len(batches), date_from, date_to,
         )
 
-        for batch_idx, batch in enumerate(batches):
-            logger.info("Stats batch %d/%d: campaigns %s", batch_idx + 1, len(batches), batch)
-
-            batch_success = False
-            for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
-                # Step 1: Order report
-                uuid = await self.order_report(batch, date_from, date_to)
-                if not uuid:
-                    if attempt < RETRY_MAX_ATTEMPTS:
-                        logger.warning(
-                            "Batch %d/%d: order_report failed (attempt %d/%d), "
-                            "pausing %ds before retry...",
-                            batch_idx + 1, len(batches),
-                            attempt, RETRY_MAX_ATTEMPTS, RETRY_PAUSE_SECONDS,
-                        )
-                        await asyncio.sleep(RETRY_PAUSE_SECONDS)
-                        # Reset internal backoff so retry actually reaches Ozon
-                        await self._reset_rate_limiter_backoff()
-                        continue
-                    else:
+        semaphore = asyncio.Semaphore(REPORTS_IN_FLIGHT)
+        order_lock = asyncio.Lock()     # orders share self.db via the cached MarketplaceClient
+        download_lock = asyncio.Lock()  # Ozon: 1 concurrent download per account
+        last_order_at = 0.0
+
+        async def order(batch: List[int]) -> Optional[str]:
+            nonlocal last_order_at
+            async with order_lock:
+                # Keep successive orders BATCH_PAUSE_SECONDS apart
+                delay = last_order_at + BATCH_PAUSE_SECONDS - time.monotonic()
+                if last_order_at and delay > 0:
+                    await asyncio.sleep(delay)
+                last_order_at = time.monotonic()
+                return await self.order_report(batch, date_from, date_to)
+
+        async def attempt_batch(batch: List[int]) -> Tuple[Optional[List[OzonStatRow]], str]:
+            """One order → wait → download pass: (rows, "") or (None, failed stage)."""
+            # Step 1: Order report
+            uuid = await order(batch)
+            if not uuid:
+                return None, "order_report"
+
+            # Step 2: Wait for report (polls of different batches overlap)
+            link = await self.wait_for_report(uuid)
+            if not link:
+                return None, "wait_for_report"
+
+            # Step 3: Download + parse report (one download at a time)
+            async with download_lock:
+                rows = await self.fetch_and_parse_report(link, shop_id)
+            if rows is None:
+                return None, "fetch_and_parse_report"
+            return rows, ""
+
+        async def run_batch(batch_idx: int, batch: List[int]) -> List[OzonStatRow]:
+            async with semaphore:
+                logger.info("Stats batch %d/%d: campaigns %s", batch_idx + 1, len(batches), batch)
+
+                for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+                    rows, failed_stage = await attempt_batch(batch)
+                    if rows is not None:
+                        if attempt > 1:
+                            logger.info(
+                                "Batch %d/%d: succeeded on attempt %d",
+                                batch_idx + 1, len(batches), attempt,
+                            )
+                        return rows
+
+                    if attempt == RETRY_MAX_ATTEMPTS:
                         logger.error(
-                            "Batch %d/%d: order_report failed after %d attempts, skipping",
-                            batch_idx + 1, len(batches), RETRY_MAX_ATTEMPTS,
+                            "Batch %d/%d: %s failed after %d attempts, skipping",
+                            batch_idx + 1, len(batches), failed_stage, RETRY_MAX_ATTEMPTS,
                         )
                         break
 
-                # Step 2: Wait for report
-                link = await self.wait_for_report(uuid)
-                if not link:
-                    if attempt < RETRY_MAX_ATTEMPTS:
-                        logger.warning(
-                            "Batch %d/%d: wait_for_report failed (attempt %d/%d), "
-                            "pausing %ds before retry...",
-                            batch_idx + 1, len(batches),
-                            attempt, RETRY_MAX_ATTEMPTS, RETRY_PAUSE_SECONDS,
-                        )
-                        await asyncio.sleep(RETRY_PAUSE_SECONDS)
-                        await self._reset_rate_limiter_backoff()
-                        continue
-                    else:
-                        logger.error(
-                            "Batch %d/%d: wait_for_report failed after %d attempts, skipping",
-                            batch_idx + 1, len(batches), RETRY_MAX_ATTEMPTS,
-                        )
-                        break
+                    pause = min(RETRY_PAUSE_MAX, RETRY_PAUSE_SECONDS * 2 ** (attempt - 1))
+                    pause *= random.uniform(0.8, 1.2)
+                    logger.warning(
+                        "Batch %d/%d: %s failed (attempt %d/%d), pausing %ds before retry...",
+                        batch_idx + 1, len(batches), failed_stage,
+                        attempt, RETRY_MAX_ATTEMPTS, pause,
+                    )
+                    await asyncio.sleep(pause)
+                    # Reset internal backoff so retry actually reaches Ozon
+                    await self._reset_rate_limiter_backoff()
 
-                # Step 3: Download report
-                csv_text = await self.download_report(link)
-                if not csv_text:
-                    if attempt < RETRY_MAX_ATTEMPTS:
-                        logger.warning(
-                            "Batch %d/%d: download_report failed (attempt %d/%d), "
-                            "pausing %ds before retry...",
-                            batch_idx + 1, len(batches),
-                            attempt, RETRY_MAX_ATTEMPTS, RETRY_PAUSE_SECONDS,
-                        )
-                        await asyncio.sleep(RETRY_PAUSE_SECONDS)
-                        await self._reset_rate_limiter_backoff()
-                        continue
-                    else:
-                        logger.error(
-                            "Batch %d/%d: download_report failed after %d attempts, skipping",
-                            batch_idx + 1, len(batches), RETRY_MAX_ATTEMPTS,
-                        )
-                        break
+                return []
 
-                # Step 4: Parse — success!
-                rows = self.parse_csv_report(csv_text, shop_id)
-                all_rows.extend(rows)
-                batch_success = True
-                if attempt > 1:
-                    logger.info(
-                        "Batch %d/%d: succeeded on attempt %d",
-                        batch_idx + 1, len(batches), attempt,
-                    )
-                break
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(run_batch(batch_idx, batch))
+                for batch_idx, batch in enumerate(batches)
+            ]
 
-            # Rate limit between batches (Ozon: 1 concurrent report per account)
-            if batch_idx < len(batches) - 1:
-                pause = BATCH_PAUSE_SECONDS if batch_success else RETRY_PAUSE_SECONDS
-                logger.info("Pausing %ds before next batch...", pause)
-                await asyncio.sleep(pause)
+        for task in tasks:
+            all_rows.extend(task.result())
 
         logger.info("Total stats rows from all batches: %d", len(all_rows))
         return all_rows
@@ -703,82 +946,80 @@ class OzonBidsLoader:
         if not bids or not self._client:
             return 0
 
-        now = datetime.utcnow()
-        rows = []
-        for b in bids:
-            rows.append([
-                now,
-                shop_id,
-                b["campaign_id"],
-                b["sku"],
-                b["bid_rub"],
-                0.0,  # price — will be enriched from dim_ozon_products later
-            ])
+        # Column-oriented: one list per column, built directly from the bid dicts
+        row_count = len(bids)
+        columns = [
+            [datetime.utcnow()] * row_count,
+            [shop_id] * row_count,
+            [b["campaign_id"] for b in bids],
+            [b["sku"] for b in bids],
+            [b["bid_rub"] for b in bids],
+            [0.0] * row_count,  # price — will be enriched from dim_ozon_products later
+        ]
 
         self._client.insert(
-            CH_BIDS_TABLE, rows,
+            CH_BIDS_TABLE, columns,
             column_names=["timestamp", "shop_id", "campaign_id", "sku", "avg_cpc", "price"],
+            column_oriented=True,
         )
-        logger.info("Inserted %d bid snapshots into ClickHouse", len(rows))
-        return len(rows)
+        logger.info("Inserted %d bid snapshots into ClickHouse", row_count)
+        return row_count
 
-    def insert_stats(self, rows: List[dict]) -> int:
+    async def ainsert_bids(self, shop_id: int, bids: List[dict]) -> int:
+        """insert_bids on a worker thread, so the event loop stays responsive."""
+        return await asyncio.to_thread(self.insert_bids, shop_id, bids)
+
+    def insert_stats(self, rows: List[OzonStatRow]) -> int:
         """Insert statistics rows into fact_ozon_ad_daily."""
         if not rows or not self._client:
             return 0
 
-        now = datetime.utcnow()
-        ch_rows = []
-
-        # Deduplicate by (shop_id, campaign_id, sku, dt)
-        seen = set()
-        for r in rows:
-            key = (r["shop_id"], r["campaign_id"], r["sku"], str(r["dt"]))
-            if key in seen:
-                continue
-            seen.add(key)
-
-            ch_rows.append([
-                r["dt"],
-                now,
-                r["shop_id"],
-                r["campaign_id"],
-                r["sku"],
-                r["views"],
-                r["clicks"],
-                r["ctr"],
-                r["add_to_cart"],
-                r["avg_cpc"],
-                r["money_spent"],
-                r["orders"],
-                r["revenue"],
-                r["model_orders"],
-                r["model_revenue"],
-                r["drr"],
-            ])
-
+        # Deduplicate by (shop_id, campaign_id, sku, dt), first row wins:
+        # keys built by itemgetter and the dict filled by zip, both in C;
+        # iterating in reverse lets earlier rows overwrite later duplicates
+        reversed_rows = rows[::-1]
+        unique = dict(zip(map(_stat_row_key, reversed_rows), reversed_rows))
+        row_count = len(unique)
+
+        # Column-oriented insert: transpose once here (C-level zip) instead of
+        # building a Python list per row for the driver to transpose again
+        dt, *rest = zip(*unique.values())
+        data = [dt, [datetime.utcnow()] * row_count, *rest]
         columns = [
             "dt", "updated_at", "shop_id", "campaign_id", "sku",
             "views", "clicks", "ctr", "add_to_cart", "avg_cpc",
             "money_spent", "orders", "revenue", "model_orders",
             "model_revenue", "drr",
         ]
-        self._client.insert(CH_STATS_TABLE, ch_rows, column_names=columns)
+        self._client.insert(
+            CH_STATS_TABLE, data, column_names=columns, column_oriented=True,
+        )
+
+        logger.info(
+            "Inserted %d stats rows into ClickHouse (deduplicated from %d)",
+            row_count, len(rows),
+        )
+        return row_count
+
+    async def ainsert_stats(self, rows: List[OzonStatRow]) -> int:
+        """insert_stats on a worker thread, so the event loop stays responsive."""
+        return await asyncio.to_thread(self.insert_stats, rows)
+
+    def optimize_stats_table(self):
+        """
+        Force-merge fact_ozon_ad_daily to collapse duplicates.
 
-        # Force merge to collapse duplicates immediately
-        # (ReplacingMergeTree only deduplicates on background merges or FINAL queries)
+        Maintenance only (daily optimize_ozon_ad_stats task): readers use FINAL,
+        so inserts don't need it, and OPTIMIZE ... FINAL rewrites whole parts.
+        """
+        if not self._client:
+            return
         try:
             self._client.command(f"OPTIMIZE TABLE {CH_STATS_TABLE} FINAL")
             logger.info("OPTIMIZE TABLE %s FINAL completed", CH_STATS_TABLE)
         except Exception as e:
             logger.warning("OPTIMIZE TABLE failed (non-critical): %s", e)
 
-        logger.info(
-            "Inserted %d stats rows into ClickHouse (deduplicated from %d)",
-            len(ch_rows), len(rows),
-        )
-        return len(ch_rows)
-
     def get_stats_summary(self, shop_id: int) -> dict:
         """Get summary statistics."""
         if not self._client:
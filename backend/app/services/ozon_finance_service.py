@@ -7,13 +7,15 @@ bank reconciliation, and per-item cost accounting.
 API: POST /v3/finance/transaction/list
     - Period limit: max 1 month per request
     - Pagination: page + page_size (max 1000)
-    - Rate limit: ~1.5s between pages
+    - Rate limit: ~1.5s between pages (ozon_finance limiter key)
 
 Data flow:
-    1. fetch_transactions(from, to) → paginated list for one month
+    1. fetch_transactions(from, to) → paginated list for one month,
+       each page flattened by _normalize_transaction() in a worker thread
+       while the next page downloads
     2. fetch_all_transactions(since, to) → chunked by month
-    3. _normalize_transaction() → flat rows
-    4. OzonTransactionsLoader → ClickHouse fact_ozon_transactions
+    3. OzonTransactionsLoader → ClickHouse fact_ozon_transactions
+       (load_all_transactions streams 2+3 for backfills)
 
 Маппинг operation_type → category:
     Revenue, Refund, Logistics, Marketing, Storage,
@@ -22,20 +24,25 @@ Data flow:
 
 import asyncio
 import logging
+import sys
 from datetime import datetime, timedelta
-from decimal import Decimal
+from operator import itemgetter
 from typing import List, Optional, Dict
 
 import clickhouse_connect
 from clickhouse_connect.driver.client import Client as ClickHouseClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.core.marketplace_client import MarketplaceClient
 
 logger = logging.getLogger(__name__)
 
 PAGE_SIZE = 1000
-RATE_LIMIT_PAUSE = 1.5
-CH_BATCH_SIZE = 500
+CH_BATCH_SIZE = get_settings().clickhouse_insert_batch_size
+MONTH_CONCURRENCY = 4  # monthly chunks fetched at once (each with its own DB session)
+INSERT_QUEUE_SIZE = 2  # fetched months waiting for the inserter before fetchers block
+_EMPTY: dict = {}  # shared read-only default for missing response fields
 
 
 # ── Operation Type → Category Mapping ─────────────────────
@@ -91,27 +98,61 @@ def _get_category(operation_type: str) -> str:
     return OPERATION_CATEGORY_MAP.get(operation_type, "Other")
 
 
-def _safe_decimal(val) -> Decimal:
+def _safe_float(val) -> float:
+    # Money stays float in memory; insert_transactions hands it to the Decimal columns as text
+    if type(val) is float:  # what the JSON decoder hands back for nearly every amount
+        return val
     if val is None or val == "":
-        return Decimal("0")
+        return 0.0
     try:
-        return Decimal(str(val))
+        return float(val)
     except Exception:
-        return Decimal("0")
+        return 0.0
 
 
 def _parse_dt(val) -> datetime:
     """Parse Ozon finance datetime 'YYYY-MM-DD HH:MM:SS'."""
     if not val:
         return datetime(1970, 1, 1)
+    s = str(val).strip()
     try:
-        return datetime.strptime(str(val).strip(), "%Y-%m-%d %H:%M:%S")
+        # C-level parser; also covers the ISO 'T...Z' form since Python 3.11
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        pass
+    else:
+        # replace() builds a new object; the API's plain form is already naive
+        return dt if dt.tzinfo is None else dt.replace(tzinfo=None)
+    try:
+        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
     except Exception:
-        try:
-            s = str(val).replace("Z", "+00:00")
-            return datetime.fromisoformat(s).replace(tzinfo=None)
-        except Exception:
-            return datetime(1970, 1, 1)
+        return datetime(1970, 1, 1)
+
+
+def _iter_month_chunks(dt_since: datetime, dt_to: datetime) -> List[tuple]:
+    """
+    Split [dt_since, dt_to) into calendar-month chunks.
+
+    Returns:
+        List of (from_str, to_str) ISO strings; the first chunk starts at
+        dt_since, the following ones on the 1st of each month.
+    """
+    chunks = []
+    chunk_start = dt_since
+    ym = dt_since.year * 12 + dt_since.month - 1
+
+    while chunk_start < dt_to:
+        ym += 1
+        year, month0 = divmod(ym, 12)
+        next_month = chunk_start.replace(year=year, month=month0 + 1, day=1)
+        # isoformat is C-level; _parse_dt results are always naive
+        chunks.append((
+            chunk_start.isoformat(timespec="seconds") + ".000Z",
+            min(next_month, dt_to).isoformat(timespec="seconds") + ".000Z",
+        ))
+        chunk_start = next_month
+
+    return chunks
 
 
 # ── Service ────────────────────────────────────────────────
@@ -124,7 +165,7 @@ class OzonFinanceService:
     Handles:
         - Pagination (page + page_size)
         - Monthly chunking (API limit: max 1 month per request)
-        - Rate limiting (1.5s between pages)
+        - Rate limiting (shared ozon_finance limiter)
         - Proxy rotation via MarketplaceClient
     """
 
@@ -134,14 +175,15 @@ class OzonFinanceService:
         self.api_key = api_key
         self.client_id = client_id
 
-    def _make_client(self):
+    def _make_client(self, db: Optional[AsyncSession] = None):
         return MarketplaceClient(
-            db=self.db, shop_id=self.shop_id, marketplace="ozon",
+            db=db if db is not None else self.db, shop_id=self.shop_id,
+            marketplace="ozon_finance",
             api_key=self.api_key, client_id=self.client_id,
         )
 
     async def fetch_transactions(
-        self, from_dt: str, to_dt: str,
+        self, from_dt: str, to_dt: str, db: Optional[AsyncSession] = None,
     ) -> List[dict]:
         """
         Fetch transactions for a SINGLE period (max 1 month).
@@ -151,15 +193,19 @@ class OzonFinanceService:
         Args:
             from_dt: ISO datetime string (start of period)
             to_dt: ISO datetime string (end of period)
+            db: session for MarketplaceClient (default self.db); concurrent
+                callers must pass their own
 
         Returns:
-            List of raw operation dicts from API
+            List of normalized transaction rows (see _normalize_transaction)
         """
-        all_ops = []
+        # Each page is normalized in a worker thread while the next one downloads
+        pending = []
+        fetched = 0
         page = 1
 
-        while True:
-            async with self._make_client() as client:
+        async with self._make_client(db) as client:
+            while True:
                 response = await client.post(
                     "/v3/finance/transaction/list",
                     json={
@@ -175,31 +221,45 @@ class OzonFinanceService:
                     },
                 )
 
-            if not response.is_success:
-                logger.error(
-                    "Finance list failed: %s %s",
-                    response.status_code, response.data,
+                if not response.is_success:
+                    logger.error(
+                        "Finance list failed: %s %s",
+                        response.status_code, response.data,
+                    )
+                    break
+
+                result = (response.data or _EMPTY).get("result") or _EMPTY
+                operations = result.get("operations")
+                if not operations:
+                    break
+
+                pending.append(asyncio.create_task(
+                    asyncio.to_thread(normalize_transactions, operations)
+                ))
+                fetched += len(operations)
+                logger.info(
+                    "Finance page %d: %d ops (total %d) [%s → %s]",
+                    page, len(operations), fetched,
+                    from_dt[:10], to_dt[:10],
                 )
-                break
-
-            operations = response.data.get("result", {}).get("operations", [])
-            if not operations:
-                break
 
-            all_ops.extend(operations)
-            logger.info(
-                "Finance page %d: %d ops (total %d) [%s → %s]",
-                page, len(operations), len(all_ops),
-                from_dt[:10], to_dt[:10],
-            )
+                if len(operations) < PAGE_SIZE:
+                    break
 
-            if len(operations) < PAGE_SIZE:
-                break
+                page += 1
 
-            page += 1
-            await asyncio.sleep(RATE_LIMIT_PAUSE)
+        return [row for batch in await asyncio.gather(*pending) for row in batch]
 
-        return all_ops
+    async def _fetch_month(
+        self, semaphore: asyncio.Semaphore, from_str: str, to_str: str,
+    ) -> List[dict]:
+        """fetch_transactions for one chunk under the semaphore, on its own session."""
+        async with semaphore:
+            logger.info("Finance chunk: %s → %s", from_str[:10], to_str[:10])
+            async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+                ops = await self.fetch_transactions(from_str, to_str, db=db)
+                await db.commit()
+            return ops
 
     async def fetch_all_transactions(
         self, since: str, to: str,
@@ -208,41 +268,88 @@ class OzonFinanceService:
         Fetch transactions for any period, chunking by calendar months.
 
         Ozon limits each request to max 1 month. This method automatically
-        generates monthly chunks: [Jan 1-31], [Feb 1-28], etc.
+        generates monthly chunks: [Jan 1-31], [Feb 1-28], etc. Up to
+        MONTH_CONCURRENCY chunks are fetched at once; MarketplaceClient's
+        rate limiter still paces the requests.
 
         Args:
             since: ISO datetime string (overall start)
             to: ISO datetime string (overall end)
 
         Returns:
-            List of raw operation dicts, all months combined
+            List of normalized transaction rows, all months combined (in month order)
         """
         dt_since = _parse_dt(since)
         dt_to = _parse_dt(to)
 
-        all_ops = []
-        chunk_start = dt_since
+        months = _iter_month_chunks(dt_since, dt_to)
+        logger.info("Finance: %d monthly chunks [%s → %s]", len(months), since[:10], to[:10])
+
+        semaphore = asyncio.Semaphore(MONTH_CONCURRENCY)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._fetch_month(semaphore, from_str, to_str))
+                for from_str, to_str in months
+            ]
+
+        all_ops = [op for task in tasks for op in task.result()]
+        logger.info("Finance total: %d operations", len(all_ops))
+        return all_ops
 
-        while chunk_start < dt_to:
-            # End of current month
-            if chunk_start.month == 12:
-                next_month = chunk_start.replace(year=chunk_start.year + 1, month=1, day=1)
-            else:
-                next_month = chunk_start.replace(month=chunk_start.month + 1, day=1)
+    async def load_all_transactions(
+        self, since: str, to: str, loader: "OzonTransactionsLoader",
+    ) -> int:
+        """
+        Fetch transactions for any period and insert them as months arrive.
 
-            chunk_end = min(next_month, dt_to)
+        Same chunking as fetch_all_transactions, but fetched months go
+        through a bounded queue to a single consumer that inserts every
+        CH_BATCH_SIZE rows (off the event loop), so a long backfill never
+        holds more than a few months in memory and inserts overlap the
+        remaining fetches.
 
-            from_str = chunk_start.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-            to_str = chunk_end.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        Args:
+            since: ISO datetime string (overall start)
+            to: ISO datetime string (overall end)
+            loader: connected OzonTransactionsLoader
 
-            logger.info("Finance chunk: %s → %s", from_str[:10], to_str[:10])
-            ops = await self.fetch_transactions(from_str, to_str)
-            all_ops.extend(ops)
+        Returns:
+            Number of rows inserted
+        """
+        months = _iter_month_chunks(_parse_dt(since), _parse_dt(to))
+        logger.info("Finance: %d monthly chunks [%s → %s]", len(months), since[:10], to[:10])
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=INSERT_QUEUE_SIZE)
+        semaphore = asyncio.Semaphore(MONTH_CONCURRENCY)
+
+        async def produce(from_str: str, to_str: str):
+            await queue.put(await self._fetch_month(semaphore, from_str, to_str))
+
+        async def consume() -> int:
+            inserted = 0
+            buffer: List[dict] = []
+            while (rows := await queue.get()) is not None:
+                buffer.extend(rows)
+                if len(buffer) >= CH_BATCH_SIZE:
+                    inserted += await asyncio.to_thread(
+                        loader.insert_transactions, self.shop_id, buffer,
+                    )
+                    buffer = []
+            if buffer:
+                inserted += await asyncio.to_thread(
+                    loader.insert_transactions, self.shop_id, buffer,
+                )
+            return inserted
 
-            chunk_start = next_month
+        async with asyncio.TaskGroup() as tg:
+            consumer = tg.create_task(consume())
+            async with asyncio.TaskGroup() as producers:
+                for from_str, to_str in months:
+                    producers.create_task(produce(from_str, to_str))
+            await queue.put(None)  # all months fetched
 
-        logger.info("Finance total: %d operations", len(all_ops))
-        return all_ops
+        logger.info("Finance total: %d operations inserted", consumer.result())
+        return consumer.result()
 
 
 # ── Normalization ──────────────────────────────────────────
@@ -268,26 +375,32 @@ def _normalize_transaction(op: dict) -> dict:
     sku = item.get("sku", 0) or 0
     item_name = item.get("name", "") or ""
 
-    # Sum all service prices
-    services_total = sum(s.get("price", 0) or 0 for s in services)
+    # Sum all service prices (plain loop: ~2.5x cheaper than sum() over a genexpr)
+    services_total = 0
+    for s in services:
+        price = s.get("price")
+        if price:
+            services_total += price
 
-    operation_type = op.get("operation_type", "")
+    # Low-cardinality labels repeat across every row of a backfill: intern them
+    # so the held rows share one string object per distinct value
+    operation_type = sys.intern(op.get("operation_type") or "")
 
     return {
         "operation_id": op.get("operation_id", 0),
         "operation_date": _parse_dt(op.get("operation_date")),
         "operation_type": operation_type,
-        "operation_type_name": op.get("operation_type_name", ""),
+        "operation_type_name": sys.intern(op.get("operation_type_name") or ""),
         "category": _get_category(operation_type),
         "posting_number": posting.get("posting_number", "") or "",
-        "delivery_schema": posting.get("delivery_schema", "") or "",
+        "delivery_schema": sys.intern(posting.get("delivery_schema") or ""),
         "sku": sku,
         "item_name": item_name,
-        "amount": _safe_decimal(op.get("amount", 0)),
-        "accruals_for_sale": _safe_decimal(op.get("accruals_for_sale", 0)),
-        "sale_commission": _safe_decimal(op.get("sale_commission", 0)),
-        "services_total": _safe_decimal(services_total),
-        "type": op.get("type", ""),
+        "amount": _safe_float(op.get("amount", 0)),
+        "accruals_for_sale": _safe_float(op.get("accruals_for_sale", 0)),
+        "sale_commission": _safe_float(op.get("sale_commission", 0)),
+        "services_total": round(_safe_float(services_total), 2),
+        "type": sys.intern(op.get("type") or ""),
     }
 
 
@@ -307,6 +420,13 @@ CH_COLUMNS = [
     "type", "shop_id", "updated_at",
 ]
 
+# Decimal(18, 2) columns. clickhouse-connect builds each cell as
+# int(Decimal(value) * 100), which truncates binary floats (0.29 → 0.28),
+# so these go over as repr() text, which Decimal parses exactly.
+CH_MONEY_COLUMNS = frozenset(
+    ("amount", "accruals_for_sale", "sale_commission", "services_total")
+)
+
 
 class OzonTransactionsLoader:
     """Insert normalized transaction rows into ClickHouse."""
@@ -331,6 +451,7 @@ class OzonTransactionsLoader:
             host=self.host, port=self.port,
             username=self.username, password=self.password,
             database=self.database,
+            compress="lz4",  # lz4-compressed HTTP bodies for the large backfill inserts
         )
 
     def close(self):
@@ -361,34 +482,29 @@ class OzonTransactionsLoader:
         if not transactions or not self._client:
             return 0
 
-        now = datetime.utcnow()
-        rows = []
-
-        for t in transactions:
-            rows.append([
-                t["operation_id"],
-                t["operation_date"],
-                t["operation_type"],
-                t["operation_type_name"],
-                t["category"],
-                t["posting_number"],
-                t["delivery_schema"],
-                t["sku"],
-                t["item_name"],
-                t["amount"],
-                t["accruals_for_sale"],
-                t["sale_commission"],
-                t["services_total"],
-                t["type"],
-                shop_id,
-                now,
-            ])
-
+        # One row per operation_id, sorted in the table's ORDER BY
+        # (shop_id, operation_date, operation_id) so the part needs no server-side sort
+        unique = {t["operation_id"]: t for t in transactions}
+        transactions = sorted(unique.values(), key=itemgetter("operation_date", "operation_id"))
+
+        n = len(transactions)
+        columns = [
+            [repr(t[c]) for t in transactions] if c in CH_MONEY_COLUMNS
+            else [t[c] for t in transactions]
+            for c in CH_COLUMNS[:-2]
+        ]
+        columns.append([shop_id] * n)
+        columns.append([datetime.utcnow()] * n)
+
+        settings = get_settings().get_clickhouse_insert_settings(n)
         total = 0
-        for i in range(0, len(rows), CH_BATCH_SIZE):
-            batch = rows[i:i + CH_BATCH_SIZE]
-            self._client.insert(CH_TABLE, batch, column_names=CH_COLUMNS)
-            total += len(batch)
+        for i in range(0, n, CH_BATCH_SIZE):
+            batch = [col[i:i + CH_BATCH_SIZE] for col in columns]
+            self._client.insert(
+                CH_TABLE, batch, column_names=CH_COLUMNS, column_oriented=True,
+                settings=settings,
+            )
+            total += len(batch[0])
 
         logger.info("Inserted %d transaction rows into ClickHouse", total)
         return total
@@ -20,18 +20,22 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
+from operator import itemgetter
 from typing import List, Optional, Dict
 
 import clickhouse_connect
 from clickhouse_connect.driver.client import Client as ClickHouseClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.core.marketplace_client import MarketplaceClient
 
 logger = logging.getLogger(__name__)
 
 API_LIMIT = 1000
-RATE_LIMIT_PAUSE = 1.0  # aggressive rate limit on this endpoint
-CH_BATCH_SIZE = 500
+CH_BATCH_SIZE = get_settings().clickhouse_insert_batch_size
+WINDOW_CONCURRENCY = 4  # 90-day windows fetched at once (each with its own DB session)
+_EMPTY: dict = {}  # shared read-only default for missing response fields
 
 # The only working metrics as of 2026-02-15
 WORKING_METRICS = ["ordered_units", "revenue"]
@@ -58,6 +62,10 @@ def _safe_int(val) -> int:
 def _parse_date(val: str) -> datetime:
     if not val:
         return datetime(1970, 1, 1)
+    try:
+        return datetime.fromisoformat(val[:10])
+    except ValueError:
+        pass
     try:
         return datetime.strptime(val[:10], "%Y-%m-%d")
     except Exception:
@@ -81,26 +89,28 @@ class OzonFunnelService:
         self.api_key = api_key
         self.client_id = client_id
 
-    def _make_client(self):
+    def _make_client(self, db: Optional[AsyncSession] = None):
         return MarketplaceClient(
-            db=self.db, shop_id=self.shop_id, marketplace="ozon",
+            db=db if db is not None else self.db, shop_id=self.shop_id,
+            marketplace="ozon_analytics",
             api_key=self.api_key, client_id=self.client_id,
         )
 
     async def fetch_funnel_data(
-        self, date_from: str, date_to: str,
+        self, date_from: str, date_to: str, db: Optional[AsyncSession] = None,
     ) -> List[dict]:
         """
         Fetch sales metrics for all SKUs for the given date range.
 
         Returns list of raw API rows with sku × day × [ordered_units, revenue].
-        Max 1000 rows per page, paginates automatically.
+        Max 1000 rows per page, paginates automatically. db overrides self.db
+        for MarketplaceClient (concurrent callers must pass their own).
         """
         all_rows = []
         offset = 0
 
-        while True:
-            async with self._make_client() as client:
+        async with self._make_client(db) as client:
+            while True:
                 response = await client.post(
                     "/v1/analytics/data",
                     json={
@@ -115,59 +125,74 @@ class OzonFunnelService:
                     },
                 )
 
-            if not response.is_success:
-                logger.error("Funnel API error: %s %s",
-                             response.status_code, response.data)
-                break
+                if not response.is_success:
+                    logger.error("Funnel API error: %s %s",
+                                 response.status_code, response.data)
+                    break
 
-            data = response.data.get("result", {}).get("data", [])
-            if not data:
-                break
+                result = (response.data or _EMPTY).get("result") or _EMPTY
+                data = result.get("data")
+                if not data:
+                    break
 
-            all_rows.extend(data)
-            logger.info("Funnel page offset=%d: %d rows (total %d)",
-                        offset, len(data), len(all_rows))
+                all_rows.extend(data)
+                logger.info("Funnel page offset=%d: %d rows (total %d)",
+                            offset, len(data), len(all_rows))
 
-            if len(data) < API_LIMIT:
-                break
+                if len(data) < API_LIMIT:
+                    break
 
-            offset += len(data)
-            await asyncio.sleep(RATE_LIMIT_PAUSE)
+                offset += len(data)
 
         return all_rows
 
+    async def _fetch_window(
+        self, semaphore: asyncio.Semaphore, date_from: str, date_to: str,
+    ) -> List[dict]:
+        """fetch_funnel_data for one window under the semaphore, on its own session."""
+        async with semaphore:
+            logger.info("Funnel chunk: %s → %s", date_from, date_to)
+            async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+                raw = await self.fetch_funnel_data(date_from, date_to, db=db)
+                await db.commit()
+            return raw
+
     async def fetch_all_funnel(
         self, date_from: str, date_to: str,
     ) -> List[dict]:
         """
         Fetch funnel data, chunking by 90 days for long periods.
 
+        Up to WINDOW_CONCURRENCY windows are fetched at once;
+        MarketplaceClient's rate limiter still paces the requests.
+
         Returns normalized rows ready for ClickHouse.
         """
         dt_from = _parse_date(date_from)
         dt_to = _parse_date(date_to)
 
-        all_raw = []
+        windows = []
         chunk_start = dt_from
 
         while chunk_start < dt_to:
             chunk_end = min(chunk_start + timedelta(days=89), dt_to)
-            f = chunk_start.strftime("%Y-%m-%d")
-            t = chunk_end.strftime("%Y-%m-%d")
+            f = chunk_start.date().isoformat()
+            t = chunk_end.date().isoformat()
 
             # Ensure from < to (API requires strict inequality)
-            if f >= t:
-                chunk_start = chunk_end + timedelta(days=1)
-                continue
-
-            logger.info("Funnel chunk: %s → %s", f, t)
-            raw = await self.fetch_funnel_data(f, t)
-            all_raw.extend(raw)
+            if f < t:
+                windows.append((f, t))
 
             chunk_start = chunk_end + timedelta(days=1)
-            if chunk_start < dt_to:
-                await asyncio.sleep(RATE_LIMIT_PAUSE)
 
+        semaphore = asyncio.Semaphore(WINDOW_CONCURRENCY)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._fetch_window(semaphore, f, t))
+                for f, t in windows
+            ]
+
+        all_raw = [row for task in tasks for row in task.result()]
         normalized = _normalize_rows(all_raw)
         logger.info("Funnel total: %d raw → %d normalized", len(all_raw), len(normalized))
         return normalized
@@ -234,6 +259,7 @@ class OzonFunnelLoader:
             host=self.host, port=self.port,
             username=self.username, password=self.password,
             database=self.database,
+            compress="lz4",  # lz4-compressed HTTP bodies for the large backfill inserts
         )
 
     def close(self):
@@ -252,20 +278,30 @@ class OzonFunnelLoader:
         if not rows or not self._client:
             return 0
 
-        now = datetime.utcnow()
-        ch_rows = []
-        for r in rows:
-            ch_rows.append([
-                r["dt"], shop_id, r["sku"], r["sku_name"],
-                r["ordered_units"], r["revenue"],
-                now,
-            ])
-
+        # Dedup and pre-sort on the table key (shop_id, sku, dt)
+        unique = {(r["sku"], r["dt"]): r for r in rows}
+        rows = sorted(unique.values(), key=itemgetter("sku", "dt"))
+
+        n = len(rows)
+        columns = [
+            [r["dt"] for r in rows],
+            [shop_id] * n,
+            [r["sku"] for r in rows],
+            [r["sku_name"] for r in rows],
+            [r["ordered_units"] for r in rows],
+            [r["revenue"] for r in rows],
+            [datetime.utcnow()] * n,
+        ]
+
+        settings = get_settings().get_clickhouse_insert_settings(n)
         total = 0
-        for i in range(0, len(ch_rows), CH_BATCH_SIZE):
-            batch = ch_rows[i:i + CH_BATCH_SIZE]
-            self._client.insert(CH_TABLE, batch, column_names=CH_COLUMNS)
-            total += len(batch)
+        for i in range(0, n, CH_BATCH_SIZE):
+            batch = [col[i:i + CH_BATCH_SIZE] for col in columns]
+            self._client.insert(
+                CH_TABLE, batch, column_names=CH_COLUMNS, column_oriented=True,
+                settings=settings,
+            )
+            total += len(batch[0])
 
         logger.info("Inserted %d funnel rows into ClickHouse", total)
         return total
@@ -10,7 +10,7 @@ API Endpoints:
 Data flow:
     1. fetch_fbo_postings → paginated list of FBO postings
     2. fetch_fbs_postings → paginated list of FBS postings
-    3. normalize → unified rows (1 row per product per posting)
+    3. normalize → unified row tuples (1 per product per posting)
     4. OzonOrdersLoader → ClickHouse fact_ozon_orders
 """
 
@@ -18,17 +18,24 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional, Dict
+from typing import Dict, Iterator, List, Optional
 
 import clickhouse_connect
 from clickhouse_connect.driver.client import Client as ClickHouseClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.core.marketplace_client import MarketplaceClient
 
 logger = logging.getLogger(__name__)
 
 PAGE_SIZE = 1000
-CH_BATCH_SIZE = 500
+CH_BATCH_SIZE = get_settings().clickhouse_insert_batch_size
+FBO_PAGE_CONCURRENCY = 4  # FBO pages in flight (each worker with its own DB session)
+FBS_WINDOW_CONCURRENCY = 4  # 28-day FBS windows fetched at once
+INSERT_QUEUE_SIZE = 2  # fetched FBO/FBS batches waiting for the inserter
+FBS_CHUNK_DAYS = 28
+_EMPTY: dict = {}  # shared read-only default for missing financial data
 
 
 def _safe_decimal(val) -> Decimal:
@@ -41,16 +48,48 @@ def _safe_decimal(val) -> Decimal:
         return Decimal("0")
 
 
+def _safe_float(val) -> float:
+    """Float for commission/discount cells; insert_orders hands them to the Decimal columns as text."""
+    if type(val) is float:
+        return val
+    if val is None or val == "":
+        return 0.0
+    try:
+        return float(val)
+    except Exception:
+        return 0.0
+
+
 def _parse_dt(val) -> datetime:
     """Parse an ISO-ish datetime string, return epoch-zero on failure."""
     if not val:
         return datetime(1970, 1, 1)
     try:
-        # "2026-01-15T03:07:47.471475Z" → strip tz suffix
-        s = str(val).replace("Z", "+00:00")
-        return datetime.fromisoformat(s).replace(tzinfo=None)
+        # "2026-01-15T03:07:47.471475Z": fromisoformat takes the Z as-is on 3.11+
+        dt = datetime.fromisoformat(val if isinstance(val, str) else str(val))
     except Exception:
         return datetime(1970, 1, 1)
+    # Drop the offset (wall-clock value kept, as before); no copy for naive input
+    return dt if dt.tzinfo is None else dt.replace(tzinfo=None)
+
+
+def _fbs_windows(since: str, to: str, chunk_days: int = FBS_CHUNK_DAYS) -> List[tuple]:
+    """Split [since, to) into chunk_days windows of ISO strings for the FBS list."""
+    dt_since = datetime.fromisoformat(since.replace("Z", "+00:00")).replace(tzinfo=None)
+    dt_to = datetime.fromisoformat(to.replace("Z", "+00:00")).replace(tzinfo=None)
+
+    windows = []
+    chunk_start = dt_since
+
+    while chunk_start < dt_to:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), dt_to)
+        windows.append((
+            chunk_start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            chunk_end.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        ))
+        chunk_start = chunk_end
+
+    return windows
 
 
 # ── Service ────────────────────────────────────────────────
@@ -71,9 +110,9 @@ class OzonOrdersService:
         self.api_key = api_key
         self.client_id = client_id
 
-    def _make_client(self):
+    def _make_client(self, db: Optional[AsyncSession] = None):
         return MarketplaceClient(
-            db=self.db, shop_id=self.shop_id, marketplace="ozon",
+            db=db if db is not None else self.db, shop_id=self.shop_id, marketplace="ozon",
             api_key=self.api_key, client_id=self.client_id,
         )
 
@@ -83,72 +122,95 @@ class OzonOrdersService:
         """
         Fetch ALL FBO postings for the given period (paginated via offset).
 
+        The endpoint reports no total, so FBO_PAGE_CONCURRENCY workers claim
+        consecutive offsets until one sees a short page (at most a few
+        requests land past the end). Each worker owns one AsyncSession and
+        one MarketplaceClient; pacing is left to MarketplaceClient's rate
+        limiter. A failed page truncates the result at that offset.
+
         Args:
             since: ISO datetime string for period start
             to: ISO datetime string for period end
 
         Returns:
-            List of raw posting dicts from API
+            List of raw posting dicts from API, in offset order
         """
-        all_items = []
-        offset = 0
-
-        while True:
-            async with self._make_client() as client:
-                response = await client.post(
-                    "/v2/posting/fbo/list",
-                    json={
-                        "dir": "ASC",
-                        "filter": {
-                            "since": since,
-                            "to": to,
-                            "status": "",
-                        },
-                        "limit": limit,
-                        "offset": offset,
-                        "with": {
-                            "analytics_data": True,
-                            "financial_data": True,
-                        },
-                    },
-                )
-
-            if not response.is_success:
-                logger.error(
-                    "FBO list failed: %s %s",
-                    response.status_code, response.data,
-                )
-                break
-
-            items = response.data.get("result", [])
-            if not items:
-                break
-
-            all_items.extend(items)
-            logger.info(
-                "FBO page offset=%d → %d items (total %d)",
-                offset, len(items), len(all_items),
-            )
-
-            if len(items) < limit:
-                break
-            offset += limit
-            await asyncio.sleep(0.3)  # rate limit
-
+        pages: Dict[int, List[dict]] = {}
+        next_offset = 0
+        end_offset: Optional[int] = None  # first offset past the usable data
+
+        async def worker():
+            nonlocal next_offset, end_offset
+            async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+                async with self._make_client(db) as client:
+                    while end_offset is None or next_offset < end_offset:
+                        offset = next_offset
+                        next_offset += limit
+                        response = await client.post(
+                            "/v2/posting/fbo/list",
+                            json={
+                                "dir": "ASC",
+                                "filter": {
+                                    "since": since,
+                                    "to": to,
+                                    "status": "",
+                                },
+                                "limit": limit,
+                                "offset": offset,
+                                "with": {
+                                    "analytics_data": True,
+                                    "financial_data": True,
+                                },
+                            },
+                        )
+
+                        if not response.is_success:
+                            logger.error(
+                                "FBO list failed at offset=%d: %s %s",
+                                offset, response.status_code, response.data,
+                            )
+                            stop = offset
+                        else:
+                            items = response.data.get("result", [])
+                            if items:
+                                pages[offset] = items
+                                logger.info(
+                                    "FBO page offset=%d → %d items", offset, len(items),
+                                )
+                            if len(items) >= limit:
+                                continue
+                            stop = offset + limit
+
+                        if end_offset is None or stop < end_offset:
+                            end_offset = stop
+                await db.commit()
+
+        await asyncio.gather(*(worker() for _ in range(FBO_PAGE_CONCURRENCY)))
+
+        all_items = [
+            item
+            for offset in sorted(pages)
+            if offset < end_offset
+            for item in pages[offset]
+        ]
         logger.info("FBO total: %d postings", len(all_items))
         return all_items
 
     async def fetch_fbs_postings(
         self, since: str, to: str, *, limit: int = PAGE_SIZE,
+        db: Optional[AsyncSession] = None,
     ) -> List[dict]:
         """
         Fetch ALL FBS postings for the given period (paginated via offset + has_next).
+
+        db overrides self.db for MarketplaceClient (concurrent callers must
+        pass their own).
         """
         all_items = []
         offset = 0
 
-        while True:
-            async with self._make_client() as client:
+        async with self._make_client(db) as client:
+            while True:
                 response = await client.post(
                     "/v3/posting/fbs/list",
                     json={
@@ -167,101 +229,160 @@ class OzonOrdersService:
                     },
                 )
 
-            if not response.is_success:
-                logger.error(
-                    "FBS list failed: %s %s",
-                    response.status_code, response.data,
-                )
-                break
+                if not response.is_success:
+                    logger.error(
+                        "FBS list failed: %s %s",
+                        response.status_code, response.data,
+                    )
+                    break
 
-            result = response.data.get("result", {})
-            postings = result.get("postings", [])
-            has_next = result.get("has_next", False)
+                result = response.data.get("result", {})
+                postings = result.get("postings", [])
+                has_next = result.get("has_next", False)
 
-            if not postings:
-                break
+                if not postings:
+                    break
 
-            all_items.extend(postings)
-            logger.info(
-                "FBS page offset=%d → %d items (total %d, has_next=%s)",
-                offset, len(postings), len(all_items), has_next,
-            )
+                all_items.extend(postings)
+                logger.info(
+                    "FBS page offset=%d → %d items (total %d, has_next=%s)",
+                    offset, len(postings), len(all_items), has_next,
+                )
 
-            if not has_next:
-                break
-            offset += limit
-            await asyncio.sleep(0.3)
+                if not has_next:
+                    break
+                offset += limit
 
         logger.info("FBS total: %d postings", len(all_items))
         return all_items
 
     async def fetch_all_orders(
         self, since: str, to: str,
-    ) -> List[dict]:
+    ) -> List[tuple]:
         """
         Fetch FBO + FBS and normalize into unified rows.
 
         FBS has a PERIOD_IS_TOO_LONG limit (~30 days), so we chunk it.
         FBO does not have this limit.
 
-        Returns list of flat dicts, 1 row per product per posting.
+        Returns list of row tuples in CH_COLUMNS order (minus shop_id/updated_at),
+        1 row per product per posting.
         """
-        fbo = await self.fetch_fbo_postings(since, to)
-
-        # FBS: chunk into 30-day windows to avoid PERIOD_IS_TOO_LONG
-        fbs = await self._fetch_fbs_chunked(since, to)
+        # FBS: chunk into 30-day windows to avoid PERIOD_IS_TOO_LONG.
+        # Every source is normalized as soon as it lands, while the others
+        # are still in flight.
+        async def normalized(postings, mode: str) -> List[tuple]:
+            return list(_normalize_postings(await postings, mode))
+
+        semaphore = asyncio.Semaphore(FBS_WINDOW_CONCURRENCY)
+        async with asyncio.TaskGroup() as tg:
+            fbo_task = tg.create_task(
+                normalized(self.fetch_fbo_postings(since, to), "FBO"),
+            )
+            fbs_tasks = [
+                tg.create_task(
+                    normalized(self._fetch_fbs_window(semaphore, s, e), "FBS"),
+                )
+                for s, e in _fbs_windows(since, to)
+            ]
 
-        rows = []
-        rows.extend(_normalize_postings(fbo, "FBO"))
-        rows.extend(_normalize_postings(fbs, "FBS"))
+        fbo = fbo_task.result()
+        rows = [*fbo, *(row for task in fbs_tasks for row in task.result())]
 
         logger.info(
-            "Total normalized rows: %d (FBO=%d raw, FBS=%d raw)",
-            len(rows), len(fbo), len(fbs),
+            "Total normalized rows: %d (FBO=%d, FBS=%d)",
+            len(rows), len(fbo), len(rows) - len(fbo),
         )
         return rows
 
-    async def _fetch_fbs_chunked(
-        self, since: str, to: str, chunk_days: int = 28,
+    async def _fetch_fbs_window(
+        self, semaphore: asyncio.Semaphore, since: str, to: str,
     ) -> List[dict]:
+        """fetch_fbs_postings for one window under the semaphore, on its own session."""
+        async with semaphore:
+            logger.info("FBS chunk: %s → %s", since[:10], to[:10])
+            async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+                items = await self.fetch_fbs_postings(since, to, db=db)
+                await db.commit()
+            return items
+
+    async def load_all_orders(
+        self, since: str, to: str, loader: "OzonOrdersLoader",
+    ) -> int:
         """
-        Fetch FBS postings in time chunks to avoid PERIOD_IS_TOO_LONG error.
-
-        Ozon limits FBS queries to ~30 days. We use 28 days for safety.
-        """
-        from datetime import datetime, timedelta
-
-        dt_since = datetime.fromisoformat(since.replace("Z", "+00:00")).replace(tzinfo=None)
-        dt_to = datetime.fromisoformat(to.replace("Z", "+00:00")).replace(tzinfo=None)
+        Fetch FBO + FBS and insert normalized rows as sources complete.
 
-        all_fbs = []
-        chunk_start = dt_since
+        The FBO list and every FBS window are producers on a bounded queue;
+        one consumer normalizes each batch and inserts every CH_BATCH_SIZE
+        rows off the event loop, so a backfill holds a couple of windows of
+        raw postings rather than the whole period.
 
-        while chunk_start < dt_to:
-            chunk_end = min(chunk_start + timedelta(days=chunk_days), dt_to)
-            s = chunk_start.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-            e = chunk_end.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        Args:
+            since: ISO datetime string for period start
+            to: ISO datetime string for period end
+            loader: connected OzonOrdersLoader
 
-            logger.info("FBS chunk: %s → %s", s[:10], e[:10])
-            items = await self.fetch_fbs_postings(s, e)
-            all_fbs.extend(items)
+        Returns:
+            Number of rows inserted
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=INSERT_QUEUE_SIZE)
+        semaphore = asyncio.Semaphore(FBS_WINDOW_CONCURRENCY)
+
+        async def produce_fbo():
+            await queue.put((await self.fetch_fbo_postings(since, to), "FBO"))
+
+        async def produce_fbs(s: str, e: str):
+            await queue.put((await self._fetch_fbs_window(semaphore, s, e), "FBS"))
+
+        async def consume() -> int:
+            inserted = 0
+            buffer: List[tuple] = []
+            while (item := await queue.get()) is not None:
+                postings, mode = item
+                buffer.extend(_normalize_postings(postings, mode))
+                if len(buffer) >= CH_BATCH_SIZE:
+                    inserted += await asyncio.to_thread(
+                        loader.insert_orders, self.shop_id, buffer,
+                    )
+                    buffer = []
+            if buffer:
+                inserted += await asyncio.to_thread(
+                    loader.insert_orders, self.shop_id, buffer,
+                )
+            return inserted
 
-            chunk_start = chunk_end
+        async with asyncio.TaskGroup() as tg:
+            consumer = tg.create_task(consume())
+            async with asyncio.TaskGroup() as producers:
+                producers.create_task(produce_fbo())
+                for s, e in _fbs_windows(since, to):
+                    producers.create_task(produce_fbs(s, e))
+            await queue.put(None)  # every source fetched
 
-        logger.info("FBS chunked total: %d postings", len(all_fbs))
-        return all_fbs
+        logger.info("Ozon orders: %d rows inserted", consumer.result())
+        return consumer.result()
 
 
 # ── Normalization ──────────────────────────────────────────
 
 
-def _normalize_postings(postings: List[dict], mode: str) -> List[dict]:
+def _normalize_postings(postings: List[dict], mode: str) -> Iterator[tuple]:
     """
     Flatten postings → 1 row per product per posting.
 
-    Handles both FBO and FBS response structures.
+    Handles both FBO and FBS response structures. Yields plain tuples in
+    CH_COLUMNS order without shop_id/updated_at (the loader appends those),
+    so no per-row dict is built only to be unpacked again on insert.
     """
-    rows = []
+    # Shipment slots and batch-processed orders repeat the same timestamps:
+    # parse each distinct string once per call
+    dt_cache: Dict[Optional[str], datetime] = {}
+
+    def parse_dt(val) -> datetime:
+        dt = dt_cache.get(val)
+        if dt is None:
+            dt = dt_cache[val] = _parse_dt(val)
+        return dt
 
     for p in postings:
         posting_number = p.get("posting_number", "")
@@ -273,35 +394,41 @@ def _normalize_postings(postings: List[dict], mode: str) -> List[dict]:
         # Date: prefer created_at, fallback to in_process_at
         created_at = p.get("created_at")
         in_process_at = p.get("in_process_at")
-        order_date = _parse_dt(created_at or in_process_at)
-        in_process_dt = _parse_dt(in_process_at)
+        order_date = parse_dt(created_at or in_process_at)
+        in_process_dt = parse_dt(in_process_at)
 
         # Analytics
-        analytics = p.get("analytics_data") or {}
-        city = analytics.get("city", "") or ""
-        region = analytics.get("region", "") or ""
-        delivery_type = analytics.get("delivery_type", "") or ""
-        warehouse_name = analytics.get("warehouse_name", "") or analytics.get("warehouse", "") or ""
+        analytics = p.get("analytics_data") or _EMPTY
+        city = analytics.get("city") or ""
+        region = analytics.get("region") or ""
+        delivery_type = analytics.get("delivery_type") or ""
+        warehouse_name = analytics.get("warehouse_name") or analytics.get("warehouse") or ""
 
         # Financial (posting-level)
-        financial = p.get("financial_data") or {}
-        cluster_from = financial.get("cluster_from", "") or ""
-        cluster_to = financial.get("cluster_to", "") or ""
-        fin_products = financial.get("products", []) or []
+        financial = p.get("financial_data") or _EMPTY
+        cluster_from = financial.get("cluster_from") or ""
+        cluster_to = financial.get("cluster_to") or ""
+        fin_products = financial.get("products") or ()
 
-        # Build product_id → financial map
+        # Build product_id → financial map; the usual single-product posting
+        # is matched directly against its one entry instead
         fin_map: Dict[int, dict] = {}
-        for fp in fin_products:
-            fpid = fp.get("product_id", 0)
-            if fpid:
-                fin_map[fpid] = fp
+        fin_single: Optional[dict] = None
+        if len(fin_products) == 1:
+            fin_single = fin_products[0]
+            fin_single_id = fin_single.get("product_id", 0)
+        else:
+            for fp in fin_products:
+                fpid = fp.get("product_id", 0)
+                if fpid:
+                    fin_map[fpid] = fp
 
         # Cancellation (FBS only)
-        cancellation = p.get("cancellation") or {}
-        cancel_reason = cancellation.get("cancel_reason", "") or ""
+        cancellation = p.get("cancellation") or _EMPTY
+        cancel_reason = cancellation.get("cancel_reason") or ""
 
         # Shipment date (FBS only)
-        shipment_date = _parse_dt(p.get("shipment_date"))
+        shipment_date = parse_dt(p.get("shipment_date"))
 
         # Products
         products = p.get("products", [])
@@ -313,47 +440,33 @@ def _normalize_postings(postings: List[dict], mode: str) -> List[dict]:
             quantity = prod.get("quantity", 1)
             price = _safe_decimal(prod.get("price"))
 
-            # Match financial data by product_id or sku
-            fin = fin_map.get(product_id, fin_map.get(sku, {}))
+            # Match financial data by product_id or sku. price/old_price/payout stay
+            # Decimal; commission/discount cells are floats (sent as text by insert_orders)
+            if fin_single is not None:
+                fin = fin_single if fin_single_id and fin_single_id in (product_id, sku) else _EMPTY
+            else:
+                fin = fin_map.get(product_id)
+                if fin is None:
+                    fin = fin_map.get(sku, _EMPTY)
             old_price = _safe_decimal(fin.get("old_price", prod.get("old_price", 0)))
-            commission_amount = _safe_decimal(fin.get("commission_amount", 0))
-            commission_percent = _safe_decimal(fin.get("commission_percent", 0))
+            commission_amount = _safe_float(fin.get("commission_amount", 0))
+            commission_percent = _safe_float(fin.get("commission_percent", 0))
             payout = _safe_decimal(fin.get("payout", 0))
-            total_discount_percent = _safe_decimal(fin.get("total_discount_percent", 0))
-            total_discount_value = _safe_decimal(fin.get("total_discount_value", 0))
-
-            rows.append({
-                "posting_number": posting_number,
-                "order_id": order_id,
-                "order_number": order_number,
-                "order_date": order_date,
-                "in_process_at": in_process_dt,
-                "status": status,
-                "substatus": substatus,
-                "sku": sku,
-                "product_id": product_id,
-                "offer_id": offer_id,
-                "product_name": product_name,
-                "quantity": quantity,
-                "warehouse_mode": mode,
-                "price": price,
-                "old_price": old_price,
-                "commission_amount": commission_amount,
-                "commission_percent": commission_percent,
-                "payout": payout,
-                "total_discount_percent": total_discount_percent,
-                "total_discount_value": total_discount_value,
-                "city": city,
-                "region": region,
-                "cluster_from": cluster_from,
-                "cluster_to": cluster_to,
-                "delivery_type": delivery_type,
-                "warehouse_name": warehouse_name,
-                "cancel_reason": cancel_reason,
-                "shipment_date": shipment_date,
-            })
-
-    return rows
+            total_discount_percent = _safe_float(fin.get("total_discount_percent", 0))
+            total_discount_value = _safe_float(fin.get("total_discount_value", 0))
+
+            yield (
+                posting_number, order_id, order_number,
+                order_date, in_process_dt, status, substatus,
+                sku, product_id, offer_id, product_name, quantity,
+                mode,
+                price, old_price,
+                commission_amount, commission_percent, payout,
+                total_discount_percent, total_discount_value,
+                city, region, cluster_from, cluster_to,
+                delivery_type, warehouse_name,
+                cancel_reason, shipment_date,
+            )
 
 
 # ── ClickHouse Loader ──────────────────────────────────────
@@ -373,6 +486,16 @@ CH_COLUMNS = [
     "shop_id", "updated_at",
 ]
 
+# Decimal columns normalized as floats. clickhouse-connect builds each cell as
+# int(Decimal(value) * 10**scale), which truncates binary floats (0.29 → 0.28),
+# so insert_orders sends these as repr() text, which Decimal parses exactly.
+_FLOAT_DECIMAL_COLUMNS = tuple(
+    CH_COLUMNS.index(c) for c in (
+        "commission_amount", "commission_percent",
+        "total_discount_percent", "total_discount_value",
+    )
+)
+
 
 class OzonOrdersLoader:
     """Insert normalized order rows into ClickHouse fact_ozon_orders."""
@@ -397,6 +520,7 @@ class OzonOrdersLoader:
             host=self.host, port=self.port,
             username=self.username, password=self.password,
             database=self.database,
+            compress="lz4",  # 65k-row column batches compress well over HTTP
         )
 
     def close(self):
@@ -411,13 +535,13 @@ class OzonOrdersLoader:
     def __exit__(self, *args):
         self.close()
 
-    def insert_orders(self, shop_id: int, orders: List[dict]) -> int:
+    def insert_orders(self, shop_id: int, orders: List[tuple]) -> int:
         """
         Insert normalized order rows into ClickHouse.
 
         Args:
             shop_id: shop identifier
-            orders: list of normalized order dicts from _normalize_postings()
+            orders: row tuples from _normalize_postings()
 
         Returns:
             number of rows inserted
@@ -425,58 +549,40 @@ class OzonOrdersLoader:
         if not orders or not self._client:
             return 0
 
-        now = datetime.utcnow()
-        rows = []
-
-        for o in orders:
-            rows.append([
-                o["posting_number"],
-                o["order_id"],
-                o["order_number"],
-                o["order_date"],
-                o["in_process_at"],
-                o["status"],
-                o["substatus"],
-                o["sku"],
-                o["product_id"],
-                o["offer_id"],
-                o["product_name"],
-                o["quantity"],
-                o["warehouse_mode"],
-                o["price"],
-                o["old_price"],
-                o["commission_amount"],
-                o["commission_percent"],
-                o["payout"],
-                o["total_discount_percent"],
-                o["total_discount_value"],
-                o["city"],
-                o["region"],
-                o["cluster_from"],
-                o["cluster_to"],
-                o["delivery_type"],
-                o["warehouse_name"],
-                o["cancel_reason"],
-                o["shipment_date"],
-                shop_id,
-                now,
-            ])
+        # Column-oriented insert: one C-level transpose instead of the driver
+        # walking every row tuple
+        n = len(orders)
+        columns = [*zip(*orders), [shop_id] * n, [datetime.utcnow()] * n]
+        for i in _FLOAT_DECIMAL_COLUMNS:
+            columns[i] = list(map(repr, columns[i]))
 
         total = 0
-        for i in range(0, len(rows), CH_BATCH_SIZE):
-            batch = rows[i:i + CH_BATCH_SIZE]
-            self._client.insert(CH_TABLE, batch, column_names=CH_COLUMNS)
-            total += len(batch)
+        for i in range(0, n, CH_BATCH_SIZE):
+            batch = [col[i:i + CH_BATCH_SIZE] for col in columns]
+            self._client.insert(
+                CH_TABLE, batch, column_names=CH_COLUMNS, column_oriented=True,
+            )
+            total += len(batch[0])
 
         logger.info("Inserted %d order rows into ClickHouse", total)
         return total
 
     def get_stats(self, shop_id: int) -> dict:
-        """Get order stats from ClickHouse."""
-        if not self._client:
+        """
+        Get order stats from ClickHouse.
+
+        Returns {} (not a row of zeros) for a shop with no orders yet;
+        callers spread the result into task results, so keys may be absent.
+        """
+        return self.get_stats_bulk([shop_id]).get(shop_id, {})
+
+    def get_stats_bulk(self, shop_ids: List[int]) -> Dict[int, dict]:
+        """Get order stats for several shops in one ClickHouse round-trip."""
+        if not self._client or not shop_ids:
             return {}
         result = self._client.query("""
             SELECT
+                shop_id,
                 count() as total_rows,
                 uniq(posting_number) as unique_postings,
                 uniq(order_id) as unique_orders,
@@ -489,21 +595,22 @@ class OzonOrdersLoader:
                 min(order_date) as min_date,
                 max(order_date) as max_date
             FROM fact_ozon_orders FINAL
-            WHERE shop_id = {shop_id:UInt32}
-        """, parameters={"shop_id": shop_id})
-        r = result.first_row
-        if r:
-            return {
-                "total_rows": r[0],
-                "unique_postings": r[1],
-                "unique_orders": r[2],
-                "fbo_rows": r[3],
-                "fbs_rows": r[4],
-                "delivered": r[5],
-                "cancelled": r[6],
-                "total_payout": float(r[7]),
-                "total_commission": float(r[8]),
-                "min_date": str(r[9]),
-                "max_date": str(r[10]),
+            WHERE shop_id IN {shop_ids:Array(UInt32)}
+            GROUP BY shop_id
+        """, parameters={"shop_ids": list(shop_ids)})
+        return {
+            r[0]: {
+                "total_rows": r[1],
+                "unique_postings": r[2],
+                "unique_orders": r[3],
+                "fbo_rows": r[4],
+                "fbs_rows": r[5],
+                "delivered": r[6],
+                "cancelled": r[7],
+                "total_payout": float(r[8]),
+                "total_commission": float(r[9]),
+                "min_date": str(r[10]),
+                "max_date": str(r[11]),
             }
-        return {}
+            for r in result.result_rows
+        }
@@ -7,22 +7,21 @@ API: POST /v5/product/info/prices
 Captures daily snapshots to track pricing dynamics.
 """
 
-import asyncio
 import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import clickhouse_connect
 from clickhouse_connect.driver.client import Client as ClickHouseClient
 
+from app.config import get_settings
 from app.core.marketplace_client import MarketplaceClient
 
 logger = logging.getLogger(__name__)
 
 API_LIMIT = 1000
-RATE_LIMIT_PAUSE = 0.5
-CH_BATCH_SIZE = 500
+CH_BATCH_SIZE = get_settings().clickhouse_insert_batch_size
 
 
 def _safe_dec(val) -> Decimal:
@@ -32,6 +31,13 @@ def _safe_dec(val) -> Decimal:
         return Decimal("0")
 
 
+def _dec_text(val):
+    """Decimal cell as text for clickhouse-connect to parse (Decimal(float) would truncate)."""
+    if type(val) is float:
+        return repr(val)
+    return val or "0"
+
+
 def _safe_float(val) -> float:
     try:
         return float(val) if val else 0.0
@@ -59,10 +65,12 @@ class OzonPriceService:
         Fetch all product prices via /v5/product/info/prices.
 
         Paginates with cursor (last_id).
-        Returns normalized rows for ClickHouse.
+        Returns normalized rows for ClickHouse, one per SKU (a SKU repeated
+        across pages keeps its latest row).
         """
-        all_rows = []
+        all_rows: Dict[int, dict] = {}
         last_id = ""
+        now = datetime.utcnow().date()  # one snapshot date for every page
 
         while True:
             body = {
@@ -89,7 +97,6 @@ class OzonPriceService:
             if not items:
                 break
 
-            now = datetime.utcnow().date()
             for item in items:
                 price_obj = item.get("price", {})
                 comms = item.get("commissions", {})
@@ -101,28 +108,28 @@ class OzonPriceService:
                 pid = int(item.get("product_id", 0) or 0)
                 sku = int(item.get("sku", 0) or 0) or pid
 
-                all_rows.append({
+                all_rows[sku] = {
                     "dt": now,
                     "sku": sku,
                     "product_id": pid,
                     "offer_id": item.get("offer_id", ""),
                     "product_name": "",  # not in v5 response
-                    "price": _safe_dec(price_obj.get("price")),
-                    "old_price": _safe_dec(price_obj.get("old_price")),
-                    "min_price": _safe_dec(price_obj.get("min_price")),
-                    "marketing_price": _safe_dec(mkt_price_val),
+                    "price": _dec_text(price_obj.get("price")),
+                    "old_price": _dec_text(price_obj.get("old_price")),
+                    "min_price": _dec_text(price_obj.get("min_price")),
+                    "marketing_price": _dec_text(mkt_price_val),
                     "sales_percent": _safe_float(
                         comms.get("sales_percent_fbo", 0)),
                     "fbo_commission_percent": _safe_float(
                         comms.get("sales_percent_fbo", 0)),
                     "fbs_commission_percent": _safe_float(
                         comms.get("sales_percent_fbs", 0)),
-                    "fbo_commission_value": _safe_dec(
+                    "fbo_commission_value": _dec_text(
                         comms.get("fbo_direct_flow_trans_min_amount", 0)),
-                    "fbs_commission_value": _safe_dec(
+                    "fbs_commission_value": _dec_text(
                         comms.get("fbs_direct_flow_trans_min_amount", 0)),
                     "acquiring_percent": _safe_float(acquiring),
-                })
+                }
 
             logger.info("Prices page: %d items (total %d)",
                         len(items), len(all_rows))
@@ -131,9 +138,8 @@ class OzonPriceService:
             if not new_last_id or new_last_id == last_id:
                 break
             last_id = new_last_id
-            await asyncio.sleep(RATE_LIMIT_PAUSE)
 
-        return all_rows
+        return list(all_rows.values())
 
 
 # ── ClickHouse Loader ──────────────────────────────────────
@@ -147,6 +153,12 @@ CH_COLUMNS = [
     "acquiring_percent",
     "updated_at",
 ]
+_DECIMAL_COLUMNS = tuple(
+    CH_COLUMNS.index(c) for c in (
+        "price", "old_price", "min_price", "marketing_price",
+        "fbo_commission_value", "fbs_commission_value",
+    )
+)
 
 
 class OzonPriceLoader:
@@ -201,7 +213,16 @@ class OzonPriceLoader:
         total = 0
         for i in range(0, len(ch_rows), CH_BATCH_SIZE):
             batch = ch_rows[i:i + CH_BATCH_SIZE]
-            self._client.insert(CH_TABLE, batch, column_names=CH_COLUMNS)
+            try:
+                self._client.insert(CH_TABLE, batch, column_names=CH_COLUMNS)
+            except (ArithmeticError, TypeError, ValueError) as e:
+                # A money cell the driver could not parse: the server got a
+                # broken block and stored nothing, so retry with scrubbed cells
+                logger.warning("Price batch rejected (%s), retrying scrubbed", e)
+                for row in batch:
+                    for c in _DECIMAL_COLUMNS:
+                        row[c] = _safe_dec(row[c])
+                self._client.insert(CH_TABLE, batch, column_names=CH_COLUMNS)
             total += len(batch)
 
         logger.info("Inserted %d price rows", total)
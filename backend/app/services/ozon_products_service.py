@@ -37,6 +37,7 @@ logger = logging.getLogger(__name__)
 # ── Constants ──────────────────────────────────────────────
 PAGE_SIZE = 100  # max items per /v3/product/list request
 INFO_BATCH_SIZE = 100  # max product_ids per /v3/product/info/list
+DESCRIPTION_CONCURRENCY = 5  # in-flight /v1/product/info/description requests
 CH_TABLE = "mms_analytics.fact_ozon_inventory"
 CH_COLUMNS = [
     "fetched_at", "shop_id", "product_id", "offer_id",
@@ -44,6 +45,7 @@ CH_COLUMNS = [
     "stocks_fbo", "stocks_fbs",
 ]
 CH_BATCH_SIZE = 500
+UPSERT_PAGE_SIZE = 1000  # rows per multi-row INSERT into PostgreSQL
 
 
 def _md5(text: str) -> str:
@@ -106,10 +108,10 @@ class OzonProductsService:
         self.api_key = api_key
         self.client_id = client_id
 
-    def _make_client(self):
-        """Create MarketplaceClient context manager for Ozon."""
+    def _make_client(self, db: Optional[AsyncSession] = None):
+        """Create MarketplaceClient context manager for Ozon (db overrides self.db)."""
         return MarketplaceClient(
-            db=self.db,
+            db=db if db is not None else self.db,
             shop_id=self.shop_id,
             marketplace="ozon",
             api_key=self.api_key,
@@ -126,38 +128,38 @@ class OzonProductsService:
         all_items = []
         last_id = ""
 
-        while True:
-            async with self._make_client() as client:
+        # One client for the whole cursor walk; pacing and 429 backoff come
+        # from its rate limiter
+        async with self._make_client() as client:
+            while True:
                 response = await client.post(
                     "/v3/product/list",
                     json={"filter": {}, "last_id": last_id, "limit": PAGE_SIZE},
                 )
 
-            if not response.is_success:
-                logger.error(
-                    "Ozon /v3/product/list error: status=%s error=%s",
-                    response.status_code, response.error,
+                if not response.is_success:
+                    logger.error(
+                        "Ozon /v3/product/list error: status=%s error=%s",
+                        response.status_code, response.error,
+                    )
+                    break
+
+                data = response.data
+                result = data.get("result", {})
+                items = result.get("items", [])
+                total = result.get("total", 0)
+
+                all_items.extend(items)
+                logger.info(
+                    "Ozon product/list: got %d items (total API: %d, loaded: %d)",
+                    len(items), total, len(all_items),
                 )
-                break
 
-            data = response.data
-            result = data.get("result", {})
-            items = result.get("items", [])
-            total = result.get("total", 0)
-
-            all_items.extend(items)
-            logger.info(
-                "Ozon product/list: got %d items (total API: %d, loaded: %d)",
-                len(items), total, len(all_items),
-            )
-
-            # Next page
-            new_last_id = result.get("last_id", "")
-            if not items or not new_last_id or new_last_id == last_id:
-                break
-            last_id = new_last_id
-
-            await asyncio.sleep(0.5)  # small delay
+                # Next page
+                new_last_id = result.get("last_id", "")
+                if not items or not new_last_id or new_last_id == last_id:
+                    break
+                last_id = new_last_id
 
         return all_items
 
@@ -203,10 +205,14 @@ class OzonProductsService:
         Returns description HTML string.
         """
         async with self._make_client() as client:
-            response = await client.post(
-                "/v1/product/info/description",
-                json={"product_id": product_id},
-            )
+            return await self._fetch_description(client, product_id)
+
+    async def _fetch_description(self, client: MarketplaceClient, product_id: int) -> str:
+        """fetch_description on an already open client."""
+        response = await client.post(
+            "/v1/product/info/description",
+            json={"product_id": product_id},
+        )
 
         if not response.is_success:
             logger.warning(
@@ -220,16 +226,26 @@ class OzonProductsService:
 
     async def fetch_all_descriptions(self, product_ids: List[int]) -> Dict[int, str]:
         """
-        Fetch descriptions for all products (sequential with rate limit).
+        Fetch descriptions for all products.
+
+        DESCRIPTION_CONCURRENCY workers pull product_ids from one shared
+        iterator, each on its own AsyncSession and MarketplaceClient; pacing
+        and 429 backoff are left to MarketplaceClient's rate limiter.
 
         Returns {product_id: description_text}
         """
-        descriptions = {}
-        for pid in product_ids:
-            desc = await self.fetch_description(pid)
-            descriptions[pid] = desc
-            await asyncio.sleep(0.2)  # rate limit safety
-        return descriptions
+        descriptions: Dict[int, str] = {}
+        pending = iter(product_ids)
+
+        async def worker():
+            async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+                async with self._make_client(db) as client:
+                    for pid in pending:
+                        descriptions[pid] = await self._fetch_description(client, pid)
+                await db.commit()
+
+        await asyncio.gather(*(worker() for _ in range(DESCRIPTION_CONCURRENCY)))
+        return {pid: descriptions[pid] for pid in product_ids}
 
     async def fetch_content_ratings(self, skus: List[int]) -> List[dict]:
         """
@@ -339,6 +355,7 @@ def upsert_ozon_products(conn_params: dict, shop_id: int, products: List[dict])
         (count, events_list)
     """
     import psycopg2
+    from psycopg2.extras import execute_values
     import json as _json
 
     if not products:
@@ -348,8 +365,17 @@ def upsert_ozon_products(conn_params: dict, shop_id: int, products: List[dict])
     cursor = conn.cursor()
     count = 0
     events = []
+    rows: Dict[int, tuple] = {}  # product_id → row; a repeated id keeps its last row
 
     try:
+        # Current image hashes for the whole batch in one round-trip
+        cursor.execute(
+            "SELECT product_id, images_hash FROM dim_ozon_products "
+            "WHERE shop_id = %s AND product_id = ANY(%s)",
+            (shop_id, [item["id"] for item in products if item.get("id")]),
+        )
+        existing_hashes = dict(cursor.fetchall())
+
         for item in products:
             product_id = item.get("id")
             if not product_id:
@@ -419,23 +445,34 @@ def upsert_ozon_products(conn_params: dict, shop_id: int, products: List[dict])
                 availability_source = avails[0].get("source", "")
 
             # Check for image hash change
-            cursor.execute(
-                "SELECT images_hash FROM dim_ozon_products WHERE shop_id = %s AND product_id = %s",
-                (shop_id, product_id),
-            )
-            existing = cursor.fetchone()
-            if existing and existing[0] and existing[0] != images_hash and images_hash:
+            existing_hash = existing_hashes.get(product_id)
+            if existing_hash and existing_hash != images_hash and images_hash:
                 events.append({
                     "shop_id": shop_id,
                     "product_id": product_id,
                     "offer_id": offer_id,
                     "event_type": "OZON_PHOTO_CHANGE",
                     "field": "images",
-                    "old_value": existing[0],
+                    "old_value": existing_hash,
                     "new_value": images_hash,
                 })
+            existing_hashes[product_id] = images_hash
+
+            rows[product_id] = (
+                shop_id, product_id, offer_id, sku, name, main_image,
+                barcode, category_id, price, old_price, min_price,
+                marketing_price, volume_weight, fbo, fbs,
+                is_archived, fbo > 0, fbs > 0,
+                created_at_ozon, updated_at_ozon, vat, type_id,
+                model_id, model_count, price_index_color, price_index_value,
+                competitor_min_price, is_kgt, status, moderate_status,
+                status_name, all_images_json, images_hash,
+                primary_image_url, availability, availability_source,
+            )
+            count += 1
 
-            cursor.execute("""
+        # One multi-row upsert per UPSERT_PAGE_SIZE rows instead of one per product
+        execute_values(cursor, """
                 INSERT INTO dim_ozon_products
                     (shop_id, product_id, offer_id, sku, name, main_image_url,
                      barcode, category_id, price, old_price, min_price,
@@ -446,8 +483,7 @@ def upsert_ozon_products(conn_params: dict, shop_id: int, products: List[dict])
                      competitor_min_price, is_kgt, status, moderate_status,
                      status_name, all_images_json, images_hash,
                      primary_image_url, availability, availability_source)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES %s
                 ON CONFLICT (shop_id, product_id) DO UPDATE SET
                     offer_id = EXCLUDED.offer_id,
                     sku = EXCLUDED.sku,
@@ -484,18 +520,7 @@ def upsert_ozon_products(conn_params: dict, shop_id: int, products: List[dict])
                     availability = EXCLUDED.availability,
                     availability_source = EXCLUDED.availability_source,
                     updated_at = NOW()
-            """, (
-                shop_id, product_id, offer_id, sku, name, main_image,
-                barcode, category_id, price, old_price, min_price,
-                marketing_price, volume_weight, fbo, fbs,
-                is_archived, fbo > 0, fbs > 0,
-                created_at_ozon, updated_at_ozon, vat, type_id,
-                model_id, model_count, price_index_color, price_index_value,
-                competitor_min_price, is_kgt, status, moderate_status,
-                status_name, all_images_json, images_hash,
-                primary_image_url, availability, availability_source,
-            ))
-            count += 1
+        """, list(rows.values()), page_size=UPSERT_PAGE_SIZE)
 
         conn.commit()
     finally:
@@ -522,6 +547,7 @@ def upsert_ozon_content(
     Returns (count, events_list)
     """
     import psycopg2
+    from psycopg2.extras import execute_values
 
     if not products:
         return 0, []
@@ -530,8 +556,17 @@ def upsert_ozon_content(
     cursor = conn.cursor()
     count = 0
     events = []
+    rows: Dict[int, tuple] = {}  # product_id → row; a repeated id keeps its last row
 
     try:
+        # Current hashes for the whole batch in one round-trip
+        cursor.execute(
+            "SELECT product_id, title_hash, description_hash, main_image_url, images_hash "
+            "FROM dim_ozon_product_content WHERE shop_id = %s AND product_id = ANY(%s)",
+            (shop_id, [item["id"] for item in products if item.get("id")]),
+        )
+        existing_content = {row[0]: row[1:] for row in cursor.fetchall()}
+
         for item in products:
             product_id = item.get("id")
             if not product_id:
@@ -548,12 +583,7 @@ def upsert_ozon_content(
             images_count = len(images)
 
             # Check existing
-            cursor.execute(
-                "SELECT title_hash, description_hash, main_image_url, images_hash "
-                "FROM dim_ozon_product_content WHERE shop_id = %s AND product_id = %s",
-                (shop_id, product_id),
-            )
-            existing = cursor.fetchone()
+            existing = existing_content.get(product_id)
 
             if existing:
                 old_title, old_desc, old_image, old_images = existing
@@ -598,25 +628,30 @@ def upsert_ozon_content(
                         "new_value": images_hash,
                     })
 
-            # Upsert
-            cursor.execute("""
-                INSERT INTO dim_ozon_product_content
-                    (shop_id, product_id, title_hash, description_hash,
-                     main_image_url, images_hash, images_count)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (shop_id, product_id) DO UPDATE SET
-                    title_hash = EXCLUDED.title_hash,
-                    description_hash = EXCLUDED.description_hash,
-                    main_image_url = EXCLUDED.main_image_url,
-                    images_hash = EXCLUDED.images_hash,
-                    images_count = EXCLUDED.images_count,
-                    updated_at = NOW()
-            """, (
+            existing_content[product_id] = (
+                title_hash, description_hash, main_image, images_hash,
+            )
+            rows[product_id] = (
                 shop_id, product_id, title_hash, description_hash,
                 main_image, images_hash, images_count,
-            ))
+            )
             count += 1
 
+        # Upsert, UPSERT_PAGE_SIZE rows per statement
+        execute_values(cursor, """
+            INSERT INTO dim_ozon_product_content
+                (shop_id, product_id, title_hash, description_hash,
+                 main_image_url, images_hash, images_count)
+            VALUES %s
+            ON CONFLICT (shop_id, product_id) DO UPDATE SET
+                title_hash = EXCLUDED.title_hash,
+                description_hash = EXCLUDED.description_hash,
+                main_image_url = EXCLUDED.main_image_url,
+                images_hash = EXCLUDED.images_hash,
+                images_count = EXCLUDED.images_count,
+                updated_at = NOW()
+        """, list(rows.values()), page_size=UPSERT_PAGE_SIZE)
+
         conn.commit()
     finally:
         cursor.close()
@@ -72,6 +72,13 @@ class WBAdvertisingLoader:
     TABLE_DIM = "dim_advert_campaigns"
     TABLE_FACT_V3 = "fact_advert_stats_v3"
     TABLE_HISTORY = "ads_raw_history"
+    BID_SNAPSHOT_COLUMNS = [
+        "shop_id", "advert_id", "nm_id",
+        "bid_type", "payment_type",
+        "bid_search", "bid_recommendations",
+        "search_enabled", "recommendations_enabled",
+        "status",
+    ]
 
     def __init__(self, 
                  host: str = "clickhouse", 
@@ -414,31 +421,25 @@ class WBAdvertisingLoader:
         logger.info(f"Inserted {len(data)} rows into ads_raw_history")
         return len(data)
 
-    def insert_bid_snapshot(self, rows: List[tuple]) -> int:
+    def insert_bid_snapshot(self, columns: List[List[Any]]) -> int:
         """
-        Insert bid snapshot rows into log_wb_bids (V2 format).
+        Insert bid snapshot into log_wb_bids (V2 format).
         
-        Each row is a tuple:
-            (shop_id, advert_id, nm_id, bid_type, payment_type,
-             bid_search, bid_recommendations, search_enabled,
-             recommendations_enabled, status)
+        Column-oriented input (see EventDetector.extract_bid_snapshot_v2):
+        one list per column in BID_SNAPSHOT_COLUMNS order.
         """
-        if not rows or not self._client:
+        if not columns or not self._client:
             return 0
         
         self._client.insert(
             f"{self.DB_NAME}.log_wb_bids",
-            rows,
-            column_names=[
-                "shop_id", "advert_id", "nm_id",
-                "bid_type", "payment_type",
-                "bid_search", "bid_recommendations",
-                "search_enabled", "recommendations_enabled",
-                "status"
-            ]
+            columns,
+            column_names=self.BID_SNAPSHOT_COLUMNS,
+            column_oriented=True,
         )
-        logger.info(f"Inserted {len(rows)} rows into log_wb_bids")
-        return len(rows)
+        row_count = len(columns[0])
+        logger.info(f"Inserted {row_count} rows into log_wb_bids")
+        return row_count
 
     def get_vendor_code_cache(self, nm_ids: List[int]) -> Dict[int, str]:
         """
@@ -1,5 +1,8 @@
 """Celery application configuration with separate queues."""
 
+import asyncio
+
+import uvloop
 from celery import Celery
 from celery.schedules import crontab
 from kombu import Exchange, Queue
@@ -8,6 +11,11 @@ from app.config import get_settings
 
 settings = get_settings()
 
+# Tasks drive their async services via asyncio.run(); use uvloop for those
+# loops, as uvicorn already does for the API. Set at import so every
+# prefork child inherits the policy.
+asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 celery_app = Celery(
     "mms_worker",
     broker=settings.get_celery_broker_url(),
@@ -173,6 +181,13 @@ celery_app.conf.beat_schedule = {
         "schedule": 1800.0,  # Every 30 minutes
         "options": {"queue": "sync", "priority": 6},
     },
+
+    # ClickHouse maintenance: collapse fact_ozon_ad_daily duplicates (daily)
+    "optimize-ozon-ad-stats": {
+        "task": "celery_app.tasks.tasks.optimize_ozon_ad_stats",
+        "schedule": crontab(hour=4, minute=30),
+        "options": {"queue": "default", "priority": 2},
+    },
 }
 
 
@@ -1158,7 +1158,8 @@ def sync_wb_campaign_snapshot(self, shop_id: int, api_key: str):
                 # Step 4: Save bid snapshot to log_wb_bids
                 bids_count = 0
                 if all_v2_adverts:
-                    bid_rows = event_detector.extract_bid_snapshot_v2(shop_id, all_v2_adverts)
+                    parsed_adverts = event_detector.parse_adverts_v2(all_v2_adverts)
+                    bid_rows = event_detector.extract_bid_snapshot_v2(shop_id, parsed_adverts)
                     if bid_rows:
                         bids_count = loader.insert_bid_snapshot(bid_rows)
                         logger.info(f"[snapshot] Saved {bids_count} bid rows to log_wb_bids")
@@ -1306,19 +1307,16 @@ def sync_wb_advert_history(
             conn = psycopg2.connect(**get_settings().psycopg2_conn_params)
             cursor = conn.cursor()
             
-            for event in events:
-                cursor.execute("""
-                    INSERT INTO event_log (shop_id, advert_id, nm_id, event_type, old_value, new_value, event_metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    event.get("shop_id"),
-                    event.get("advert_id"),
-                    event.get("nm_id"),
-                    event.get("event_type"),
-                    event.get("old_value"),
-                    event.get("new_value"),
-                    json.dumps(event.get("event_metadata")) if event.get("event_metadata") else None
-                ))
+            # EventRecord field order == INSERT column order
+            cursor.executemany("""
+                INSERT INTO event_log (shop_id, advert_id, nm_id, event_type, old_value, new_value, event_metadata)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, [
+                event._replace(
+                    event_metadata=json.dumps(event.event_metadata) if event.event_metadata else None
+                )
+                for event in events
+            ])
             
             conn.commit()
             cursor.close()
@@ -1383,10 +1381,13 @@ def sync_wb_advert_history(
                     except Exception as e:
                         logger.warning(f"Error fetching V2 adverts batch: {e}")
                 
+                # Decode V2 payload once; shared by detection, extraction and snapshot
+                parsed_adverts = event_detector.parse_adverts_v2(all_v2_adverts)
+                
                 # Detect events using V2 format (per-nm_id bid tracking)
-                if accumulate_history and all_v2_adverts:
+                if accumulate_history and parsed_adverts:
                     events = event_detector.detect_changes_v2(
-                        shop_id, all_v2_adverts, campaign_type_map
+                        shop_id, parsed_adverts, campaign_type_map
                     )
                     events_detected = len(events)
                     
@@ -1396,13 +1397,13 @@ def sync_wb_advert_history(
                     # Extract campaign items, bids, types from V2
                     campaign_items, cpm_values, campaign_types = \
                         event_detector.extract_all_campaign_data_v2(
-                            all_v2_adverts, campaign_type_map
+                            parsed_adverts, campaign_type_map
                         )
                 
                 # Save bid snapshot to log_wb_bids
                 if all_v2_adverts:
                     try:
-                        bid_rows = event_detector.extract_bid_snapshot_v2(shop_id, all_v2_adverts)
+                        bid_rows = event_detector.extract_bid_snapshot_v2(shop_id, parsed_adverts)
                         if bid_rows:
                             bids_inserted = loader.insert_bid_snapshot(bid_rows)
                             logger.info(f"V2 bid snapshot: {bids_inserted} rows saved to log_wb_bids")
@@ -1582,19 +1583,16 @@ def sync_commercial_data(
             from app.config import get_settings
             conn = psycopg2.connect(**get_settings().psycopg2_conn_params)
             cursor = conn.cursor()
-            for event in events:
-                cursor.execute("""
-                    INSERT INTO event_log (shop_id, advert_id, nm_id, event_type, old_value, new_value, event_metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    event.get("shop_id"),
-                    event.get("advert_id"),
-                    event.get("nm_id"),
-                    event.get("event_type"),
-                    event.get("old_value"),
-                    event.get("new_value"),
-                    json.dumps(event.get("event_metadata")) if event.get("event_metadata") else None,
-                ))
+            # EventRecord field order == INSERT column order
+            cursor.executemany("""
+                INSERT INTO event_log (shop_id, advert_id, nm_id, event_type, old_value, new_value, event_metadata)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, [
+                event._replace(
+                    event_metadata=json.dumps(event.event_metadata) if event.event_metadata else None
+                )
+                for event in events
+            ])
             conn.commit()
             cursor.close()
             conn.close()
@@ -1808,19 +1806,16 @@ def sync_product_content(
             from app.config import get_settings
             conn = psycopg2.connect(**get_settings().psycopg2_conn_params)
             cursor = conn.cursor()
-            for event in events:
-                cursor.execute("""
-                    INSERT INTO event_log (shop_id, advert_id, nm_id, event_type, old_value, new_value, event_metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    event.get("shop_id"),
-                    event.get("advert_id"),
-                    event.get("nm_id"),
-                    event.get("event_type"),
-                    event.get("old_value"),
-                    event.get("new_value"),
-                    json.dumps(event.get("event_metadata")) if event.get("event_metadata") else None,
-                ))
+            # EventRecord field order == INSERT column order
+            cursor.executemany("""
+                INSERT INTO event_log (shop_id, advert_id, nm_id, event_type, old_value, new_value, event_metadata)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, [
+                event._replace(
+                    event_metadata=json.dumps(event.event_metadata) if event.event_metadata else None
+                )
+                for event in events
+            ])
             conn.commit()
             cursor.close()
             conn.close()
@@ -1864,15 +1859,13 @@ def sync_product_content(
                 """),
                 {"shop_id": shop_id},
             )
-            existing_hashes = {}
-            for row in rows.fetchall():
-                existing_hashes[row[0]] = {
-                    "title_hash": row[1],
-                    "description_hash": row[2],
-                    "main_photo_id": row[3],
-                    "photos_hash": row[4],
-                    "photos_count": row[5] or 0,
-                }
+            # Rows keyed by nm_id, columns in ContentEventDetector order
+            existing_hashes = {
+                nm_id: (title_hash, description_hash, main_photo_id, photos_hash, photos_count or 0)
+                for (
+                    nm_id, title_hash, description_hash, main_photo_id, photos_hash, photos_count
+                ) in rows.fetchall()
+            }
 
             # Step 3: Detect content events
             self.update_state(state="PROGRESS", meta={
@@ -1911,8 +1904,8 @@ def sync_product_content(
                 "hashes_upserted": hashes_upserted,
                 "events_detected": len(events),
                 "event_types": {
-                    etype: len([e for e in events if e["event_type"] == etype])
-                    for etype in set(e["event_type"] for e in events)
+                    etype: len([e for e in events if e.event_type == etype])
+                    for etype in set(e.event_type for e in events)
                 } if events else {},
                 "existing_hashes_count": len(existing_hashes),
                 "status": "completed",
@@ -2598,21 +2591,15 @@ def sync_ozon_orders(
                 'status': f'Fetching orders (last {days_back} days)...',
             })
 
-            async with sf() as db:
-                service = OzonOrdersService(
-                    db=db, shop_id=shop_id,
-                    api_key=api_key, client_id=client_id,
-                )
-                orders = await service.fetch_all_orders(since, to)
-
-            logger.info(f"Ozon orders: {len(orders)} rows for shop {shop_id}")
-
-            self.update_state(state='PROGRESS', meta={
-                'status': f'Inserting {len(orders)} orders into ClickHouse...',
-            })
-
             with OzonOrdersLoader(host=ch_host, port=ch_port, username=os.getenv("CLICKHOUSE_USER", "default"), password=os.getenv("CLICKHOUSE_PASSWORD", "")) as loader:
-                inserted = loader.insert_orders(shop_id, orders)
+                async with sf() as db:
+                    service = OzonOrdersService(
+                        db=db, shop_id=shop_id,
+                        api_key=api_key, client_id=client_id,
+                    )
+                    inserted = await service.load_all_orders(since, to, loader)
+
+                logger.info(f"Ozon orders: {inserted} rows for shop {shop_id}")
                 stats = loader.get_stats(shop_id)
 
             await engine.dispose()
@@ -2673,24 +2660,19 @@ def backfill_ozon_orders(
                 'status': f'Backfilling {days_back} days of orders...',
             })
 
-            async with sf() as db:
-                service = OzonOrdersService(
-                    db=db, shop_id=shop_id,
-                    api_key=api_key, client_id=client_id,
-                )
-                orders = await service.fetch_all_orders(since, to)
-
-            logger.info(
-                "Backfill: %d order rows for shop %d (%d days)",
-                len(orders), shop_id, days_back,
-            )
-
-            self.update_state(state='PROGRESS', meta={
-                'status': f'Inserting {len(orders)} historical orders...',
-            })
-
             with OzonOrdersLoader(host=ch_host, port=ch_port, username=os.getenv("CLICKHOUSE_USER", "default"), password=os.getenv("CLICKHOUSE_PASSWORD", "")) as loader:
-                inserted = loader.insert_orders(shop_id, orders)
+                async with sf() as db:
+                    service = OzonOrdersService(
+                        db=db, shop_id=shop_id,
+                        api_key=api_key, client_id=client_id,
+                    )
+                    # Rows are inserted as FBO/FBS windows arrive
+                    inserted = await service.load_all_orders(since, to, loader)
+
+                logger.info(
+                    "Backfill: %d order rows for shop %d (%d days)",
+                    inserted, shop_id, days_back,
+                )
                 stats = loader.get_stats(shop_id)
 
             await engine.dispose()
@@ -2735,7 +2717,7 @@ def sync_ozon_finance(
     from sqlalchemy.orm import sessionmaker
     from app.config import get_settings
     from app.services.ozon_finance_service import (
-        OzonFinanceService, OzonTransactionsLoader, normalize_transactions,
+        OzonFinanceService, OzonTransactionsLoader,
     )
     import logging
 
@@ -2762,9 +2744,8 @@ def sync_ozon_finance(
                     db=db, shop_id=shop_id,
                     api_key=api_key, client_id=client_id,
                 )
-                raw_ops = await service.fetch_transactions(since, to)
+                normalized = await service.fetch_transactions(since, to)
 
-            normalized = normalize_transactions(raw_ops)
             logger.info(f"Finance sync: {len(normalized)} transactions for shop {shop_id}")
 
             self.update_state(state='PROGRESS', meta={
@@ -2812,7 +2793,7 @@ def backfill_ozon_finance(
     from sqlalchemy.orm import sessionmaker
     from app.config import get_settings
     from app.services.ozon_finance_service import (
-        OzonFinanceService, OzonTransactionsLoader, normalize_transactions,
+        OzonFinanceService, OzonTransactionsLoader,
     )
     import logging
 
@@ -2834,25 +2815,19 @@ def backfill_ozon_finance(
                 'status': f'Backfilling {months_back} months of finance data...',
             })
 
-            async with sf() as db:
-                service = OzonFinanceService(
-                    db=db, shop_id=shop_id,
-                    api_key=api_key, client_id=client_id,
-                )
-                raw_ops = await service.fetch_all_transactions(since, to)
-
-            normalized = normalize_transactions(raw_ops)
-            logger.info(
-                "Finance backfill: %d transactions for shop %d (%d months)",
-                len(normalized), shop_id, months_back,
-            )
-
-            self.update_state(state='PROGRESS', meta={
-                'status': f'Inserting {len(normalized)} historical transactions...',
-            })
-
             with OzonTransactionsLoader(host=ch_host, port=ch_port, username=os.getenv("CLICKHOUSE_USER", "default"), password=os.getenv("CLICKHOUSE_PASSWORD", "")) as loader:
-                inserted = loader.insert_transactions(shop_id, normalized)
+                async with sf() as db:
+                    service = OzonFinanceService(
+                        db=db, shop_id=shop_id,
+                        api_key=api_key, client_id=client_id,
+                    )
+                    # Months are inserted as they arrive instead of all at the end
+                    inserted = await service.load_all_transactions(since, to, loader)
+
+                logger.info(
+                    "Finance backfill: %d transactions for shop %d (%d months)",
+                    inserted, shop_id, months_back,
+                )
                 stats = loader.get_stats(shop_id)
 
             await engine.dispose()
@@ -3649,6 +3624,7 @@ def monitor_ozon_bids(
     import os
     import logging
     from datetime import datetime
+    from itertools import islice
     from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
     from sqlalchemy.orm import sessionmaker
     from sqlalchemy import text
@@ -3658,6 +3634,7 @@ def monitor_ozon_bids(
 
     logger = logging.getLogger(__name__)
     settings = get_settings()
+    EVENT_INSERT_BATCH = 1000  # event_log rows per INSERT
 
     async def run_monitor():
         engine = create_async_engine(settings.database_url)
@@ -3673,15 +3650,13 @@ def monitor_ozon_bids(
         redis_client = aioredis.from_url(redis_url, decode_responses=True)
 
         try:
-            async with async_session() as db:
-                service = OzonAdsService(
-                    db=db,
-                    shop_id=shop_id,
-                    perf_client_id=perf_client_id,
-                    perf_client_secret=perf_client_secret,
-                    redis_client=redis_client,
-                )
-
+            async with async_session() as db, OzonAdsService(
+                db=db,
+                shop_id=shop_id,
+                perf_client_id=perf_client_id,
+                perf_client_secret=perf_client_secret,
+                redis_client=redis_client,
+            ) as service:
                 # 1. Get all campaigns (for status/budget tracking)
                 campaigns = await service.get_campaigns()
                 running_campaigns = [
@@ -3690,27 +3665,20 @@ def monitor_ozon_bids(
                 ]
 
                 # 2. Get products per campaign (for bid/item tracking)
-                products_by_campaign = {}
-                all_bids = []
-
-                for camp in running_campaigns:
-                    campaign_id = camp.get("id")
-                    if not campaign_id:
-                        continue
-
-                    products = await service.get_campaign_products(campaign_id)
-                    products_by_campaign[int(campaign_id)] = products
-
-                    for p in products:
-                        all_bids.append({
-                            "campaign_id": int(campaign_id),
-                            "sku": int(p.get("sku", 0)),
-                            "bid_micro": int(p.get("bid", 0)),
-                            "bid_rub": int(p.get("bid", 0)) / 1_000_000,
-                            "title": p.get("title", ""),
-                        })
-
-                    await asyncio.sleep(0.3)
+                products_by_campaign = await service.get_products_by_campaign(
+                    [int(c["id"]) for c in running_campaigns if c.get("id")]
+                )
+                all_bids = [
+                    {
+                        "campaign_id": campaign_id,
+                        "sku": p["sku"],
+                        "bid_micro": p["bid"],
+                        "bid_rub": p["bid"] / 1_000_000,
+                        "title": p.get("title", ""),
+                    }
+                    for campaign_id, products in products_by_campaign.items()
+                    for p in products
+                ]
 
                 logger.info(
                     "Ozon: fetched %d bids across %d campaigns for shop %d",
@@ -3719,37 +3687,41 @@ def monitor_ozon_bids(
 
                 # 3. Event Detection (BID_CHANGE, STATUS_CHANGE, BUDGET_CHANGE, ITEM_ADD/REMOVE)
                 detector = OzonAdsEventDetector(redis_url=str(redis_url))
-                events = detector.detect_all(
+                events_iter = detector.iter_events(
                     shop_id=shop_id,
                     campaigns=campaigns,
                     products_by_campaign=products_by_campaign,
                 )
 
-                # 4. Save events to PostgreSQL event_log
+                # 4. Save events to PostgreSQL event_log, EVENT_INSERT_BATCH rows per statement
                 events_saved = 0
-                if events:
-                    for event in events:
-                        metadata_json = json.dumps(event.get("event_metadata")) \
-                            if event.get("event_metadata") else None
-                        await db.execute(text("""
-                            INSERT INTO event_log
-                                (created_at, shop_id, advert_id, nm_id,
-                                 event_type, old_value, new_value, event_metadata)
-                            VALUES
-                                (:created_at, :shop_id, :advert_id, :nm_id,
-                                 :event_type, :old_value, :new_value, CAST(:event_metadata AS jsonb))
-                        """), {
-                            "created_at": datetime.utcnow(),
-                            "shop_id": event["shop_id"],
-                            "advert_id": event["advert_id"],
-                            "nm_id": event.get("nm_id"),
-                            "event_type": event["event_type"],
-                            "old_value": event.get("old_value"),
-                            "new_value": event.get("new_value"),
-                            "event_metadata": metadata_json,
-                        })
+                while batch := list(islice(events_iter, EVENT_INSERT_BATCH)):
+                    created_at = datetime.utcnow()
+                    await db.execute(text("""
+                        INSERT INTO event_log
+                            (created_at, shop_id, advert_id, nm_id,
+                             event_type, old_value, new_value, event_metadata)
+                        VALUES
+                            (:created_at, :shop_id, :advert_id, :nm_id,
+                             :event_type, :old_value, :new_value, CAST(:event_metadata AS jsonb))
+                    """), [
+                        {
+                            "created_at": created_at,
+                            "shop_id": event.shop_id,
+                            "advert_id": event.advert_id,
+                            "nm_id": event.nm_id,
+                            "event_type": event.event_type,
+                            "old_value": event.old_value,
+                            "new_value": event.new_value,
+                            "event_metadata": json.dumps(event.event_metadata)
+                            if event.event_metadata else None,
+                        }
+                        for event in batch
+                    ])
+                    events_saved += len(batch)
+
+                if events_saved:
                     await db.commit()
-                    events_saved = len(events)
                     logger.info("Ozon: saved %d events to event_log", events_saved)
 
             if not all_bids:
@@ -3791,7 +3763,7 @@ def monitor_ozon_bids(
                 ch_port = int(os.environ.get("CLICKHOUSE_PORT", "8123"))
 
                 with OzonBidsLoader(host=ch_host, port=ch_port, username=os.getenv("CLICKHOUSE_USER", "default"), password=os.getenv("CLICKHOUSE_PASSWORD", "")) as loader:
-                    inserted = loader.insert_bids(shop_id, changed_bids)
+                    inserted = await loader.ainsert_bids(shop_id, changed_bids)
 
             # 7. Update Redis cache
             await redis_client.setex(cache_key, 7200, json.dumps(new_cache))
@@ -3881,15 +3853,13 @@ def sync_ozon_ad_stats(
                 await engine.dispose()
                 return {'status': 'skipped', 'reason': 'backfill in progress', 'shop_id': shop_id}
 
-            async with async_session() as db:
-                service = OzonAdsService(
-                    db=db,
-                    shop_id=shop_id,
-                    perf_client_id=perf_client_id,
-                    perf_client_secret=perf_client_secret,
-                    redis_client=redis_client,
-                )
-
+            async with async_session() as db, OzonAdsService(
+                db=db,
+                shop_id=shop_id,
+                perf_client_id=perf_client_id,
+                perf_client_secret=perf_client_secret,
+                redis_client=redis_client,
+            ) as service:
                 # 1. Get all campaign IDs
                 campaigns = await service.get_campaigns()
                 campaign_ids = [c["id"] for c in campaigns if c.get("id")]
@@ -3924,7 +3894,7 @@ def sync_ozon_ad_stats(
                 ch_port = int(os.environ.get("CLICKHOUSE_PORT", "8123"))
 
                 with OzonBidsLoader(host=ch_host, port=ch_port, username=os.getenv("CLICKHOUSE_USER", "default"), password=os.getenv("CLICKHOUSE_PASSWORD", "")) as loader:
-                    inserted = loader.insert_stats(all_rows)
+                    inserted = await loader.ainsert_stats(all_rows)
 
             self.update_state(state='PROGRESS', meta={
                 'status': f'Done: {inserted} stats rows inserted',
@@ -4009,15 +3979,13 @@ def backfill_ozon_ads(
             if deleted:
                 logger.info('shop %s: reset %d rate-limiter keys for ozon_performance', shop_id, deleted)
 
-            async with async_session() as db:
-                service = OzonAdsService(
-                    db=db,
-                    shop_id=shop_id,
-                    perf_client_id=perf_client_id,
-                    perf_client_secret=perf_client_secret,
-                    redis_client=redis_client,
-                )
-
+            async with async_session() as db, OzonAdsService(
+                db=db,
+                shop_id=shop_id,
+                perf_client_id=perf_client_id,
+                perf_client_secret=perf_client_secret,
+                redis_client=redis_client,
+            ) as service:
                 # 1. Get all campaign IDs
                 campaigns = await service.get_campaigns()
                 campaign_ids = [c["id"] for c in campaigns if c.get("id")]
@@ -4076,7 +4044,7 @@ def backfill_ozon_ads(
                             )
 
                             if rows:
-                                inserted = loader.insert_stats(rows)
+                                inserted = await loader.ainsert_stats(rows)
                                 total_rows += inserted
                                 empty_streak = 0  # reset on data found
                                 logger.info(
@@ -4125,3 +4093,24 @@ def backfill_ozon_ads(
 
     return asyncio.run(run_backfill())
 
+
+@celery_app.task(bind=True, time_limit=1800, soft_time_limit=1740)
+def optimize_ozon_ad_stats(self):
+    """
+    Daily maintenance: OPTIMIZE fact_ozon_ad_daily FINAL.
+
+    insert_stats no longer forces a merge after every insert (it rewrote
+    whole parts on each sync). All readers query with FINAL, so this only
+    keeps the number of unmerged duplicate rows/parts small.
+    """
+    import os
+    from app.services.ozon_ads_service import CH_STATS_TABLE, OzonBidsLoader
+
+    ch_host = os.environ.get("CLICKHOUSE_HOST", "clickhouse")
+    ch_port = int(os.environ.get("CLICKHOUSE_PORT", "8123"))
+
+    with OzonBidsLoader(host=ch_host, port=ch_port, username=os.getenv("CLICKHOUSE_USER", "default"), password=os.getenv("CLICKHOUSE_PASSWORD", "")) as loader:
+        loader.optimize_stats_table()
+
+    return {"status": "ok", "table": CH_STATS_TABLE}
+